@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import abc
 import logging
+import sys
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -12,6 +13,14 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_FLUSH_WINDOW = 0.02  # seconds to gather a burst into one stdout write
+_SEPARATOR = "-" * 40
+_LABELS: dict[str, str] = {
+    "new": "[NEW]",
+    "updated": "[UPDATED]",
+    "circuit_open": "[CIRCUIT OPEN]",
+}
+
 
 class Consumer(abc.ABC):
     """Abstract base class that every event consumer must implement."""
@@ -34,8 +43,6 @@ class ConsoleConsumer(Consumer):
         The shared event bus to subscribe to.
     """
 
-    _SEPARATOR = "-" * 40
-
     def __init__(self, event_bus: EventBus) -> None:
         self._event_bus = event_bus
         self._running: bool = False
@@ -49,11 +56,16 @@ class ConsoleConsumer(Consumer):
         self._running = True
         logger.info("ConsoleConsumer started — waiting for events")
 
-        async for event in self._event_bus.subscribe():
+        async for batch in self._event_bus.subscribe_batches(
+            window=_FLUSH_WINDOW
+        ):
             if not self._running:
                 break
-            formatted = self._format_event(event)
-            print(formatted)
+            # One write + flush per burst instead of a print() per event.
+            sys.stdout.write(
+                "".join(f"{self._format_event(event)}\n" for event in batch)
+            )
+            sys.stdout.flush()
 
         logger.info("ConsoleConsumer stopped")
 
@@ -77,13 +89,12 @@ class ConsoleConsumer(Consumer):
             Status: Degraded performance due to upstream issue
             ----------------------------------------
         """
-        tag = "UPDATED" if event.event_type == "updated" else "NEW"
-        ts = event.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        label = _LABELS.get(event.event_type, "[NEW]")
+        message = f" {event.message}" if event.message else ""
 
         return (
-            f"[{ts}] [{tag}] Provider: {event.provider}\n"
+            f"[{event._ts_str}] {label} Provider: {event.provider}\n"
             f"Product: {event.product}\n"
-            f"Status: {event.status}"
-            + (f" {event.message}" if event.message else "")
-            + f"\n{ConsoleConsumer._SEPARATOR}"
+            f"Status: {event.status}{message}\n"
+            f"{_SEPARATOR}"
         )
@@ -3,13 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
+import ipaddress
 import json
 import logging
 from dataclasses import asdict
+from datetime import timezone
 from pathlib import Path
+from typing import Callable, Optional
 
 from aiohttp import web
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
 from consumers.console import Consumer
 from events.bus import EventBus
 from events.models import StatusEvent
@@ -17,13 +26,33 @@ from events.models import StatusEvent
 logger = logging.getLogger(__name__)
 
 _STATIC_DIR = Path(__file__).parent.parent / "static"
+_BATCH_WINDOW = 0.05  # seconds to gather a burst into one write
+_CLIENT_BACKLOG = 256  # max pending payloads per browser client
+
+
+def _is_loopback(remote: Optional[str]) -> bool:
+    """Return whether *remote* (``request.remote``) is a loopback address."""
+    if not remote:
+        return False
+    try:
+        return ipaddress.ip_address(remote).is_loopback
+    except ValueError:
+        return False
 
 
 class SSEConsumer(Consumer):
     """Serves an SSE endpoint and a simple HTML frontend.
 
-    Each browser connection gets its own EventBus subscription,
-    so multiple clients can connect independently.
+    The consumer holds a single EventBus subscription and encodes each
+    event to its SSE frame exactly once; the resulting bytes are fanned
+    out to a small per-connection queue, so multiple clients can connect
+    independently without re-serializing every event per client.
+
+    When *reset_breaker* is given (normally
+    :meth:`~core.scheduler.PollScheduler.reset_breaker`), ``POST
+    /providers/{name}/reset`` calls it to close a provider's circuit breaker.
+    The route changes scheduler state without authentication, so it only
+    answers clients connecting from the loopback interface.
     """
 
     def __init__(
@@ -31,19 +60,35 @@ class SSEConsumer(Consumer):
         event_bus: EventBus,
         host: str = "0.0.0.0",
         port: int = 8085,
+        reset_breaker: Optional[Callable[[str], bool]] = None,
     ) -> None:
         self._event_bus = event_bus
+        self._reset_breaker = reset_breaker
         self._host = host
         self._port = port
         self._running = False
         self._app = web.Application()
         self._app.router.add_get("/", self._handle_index)
         self._app.router.add_get("/events", self._handle_sse)
+        if reset_breaker is not None:
+            self._app.router.add_post(
+                "/providers/{name}/reset", self._handle_reset_breaker
+            )
         self._runner: web.AppRunner | None = None
+        self._clients: set[asyncio.Queue[bytes]] = set()
+        self._broadcast_task: asyncio.Task[None] | None = None
+        self._index_bytes = b""
+        self._index_gzip = b""
 
     async def start(self) -> None:
         """Start the HTTP server (non-blocking)."""
         self._running = True
+        # Read (and compress) the frontend once instead of per request.
+        self._index_bytes = (_STATIC_DIR / "index.html").read_bytes()
+        self._index_gzip = gzip.compress(self._index_bytes)
+        self._broadcast_task = asyncio.create_task(
+            self._broadcast(), name="sse-broadcast"
+        )
         self._runner = web.AppRunner(self._app)
         await self._runner.setup()
         site = web.TCPSite(self._runner, self._host, self._port)
@@ -53,18 +98,51 @@ class SSEConsumer(Consumer):
     async def stop(self) -> None:
         """Shut down the HTTP server."""
         self._running = False
+        if self._broadcast_task:
+            self._broadcast_task.cancel()
+            try:
+                await self._broadcast_task
+            except asyncio.CancelledError:
+                pass
+        # Wake every client handler with an empty payload so it returns
+        # now instead of holding runner.cleanup() to its shutdown timeout.
+        for queue in tuple(self._clients):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(b"")
         if self._runner:
             await self._runner.cleanup()
         logger.info("SSE server stopped")
 
     async def _handle_index(self, request: web.Request) -> web.Response:
-        """Serve the HTML frontend."""
-        html_path = _STATIC_DIR / "index.html"
+        """Serve the HTML frontend from the bytes cached in :meth:`start`."""
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            return web.Response(
+                body=self._index_gzip,
+                content_type="text/html",
+                charset="utf-8",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
         return web.Response(
-            text=html_path.read_text(),
+            body=self._index_bytes,
             content_type="text/html",
+            charset="utf-8",
+            headers={"Vary": "Accept-Encoding"},
         )
 
+    async def _handle_reset_breaker(self, request: web.Request) -> web.Response:
+        """Close the named provider's circuit breaker; 404 if it is not open."""
+        assert self._reset_breaker is not None
+        if not _is_loopback(request.remote):
+            raise web.HTTPForbidden(
+                text="Breaker reset is only allowed from localhost\n"
+            )
+        name = request.match_info["name"]
+        if not self._reset_breaker(name):
+            raise web.HTTPNotFound(text=f"No open circuit breaker for {name}\n")
+        logger.info("Circuit breaker for %s reset via HTTP", name)
+        return web.Response(status=204)
+
     async def _handle_sse(self, request: web.Request) -> web.StreamResponse:
         """Stream events to a single browser client via SSE."""
         response = web.StreamResponse(
@@ -75,26 +153,71 @@ class SSEConsumer(Consumer):
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
                 "Access-Control-Allow-Origin": "*",
+                # Stop nginx-style reverse proxies from buffering the stream.
+                "X-Accel-Buffering": "no",
             },
         )
         await response.prepare(request)
         logger.info("SSE client connected from %s", request.remote)
 
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_CLIENT_BACKLOG)
+        self._clients.add(queue)
         try:
-            async for event in self._event_bus.subscribe():
-                if not self._running:
+            while self._running:
+                payload = await queue.get()
+                if not payload:  # stop() is shutting the server down
                     break
-                data = json.dumps(self._serialize_event(event))
-                await response.write(f"data: {data}\n\n".encode("utf-8"))
+                await response.write(payload)
         except (ConnectionResetError, ConnectionError, asyncio.CancelledError):
             pass
+        finally:
+            self._clients.discard(queue)
 
         logger.info("SSE client disconnected from %s", request.remote)
         return response
 
+    async def _broadcast(self) -> None:
+        """Encode each burst of events once and fan the bytes out to clients."""
+        async for batch in self._event_bus.subscribe_batches(
+            window=_BATCH_WINDOW
+        ):
+            if not self._running:
+                break
+            if not self._clients:
+                continue
+            payload = b"".join(self._encode_frame(event) for event in batch)
+            for queue in tuple(self._clients):
+                if queue.full():
+                    # Slow client: drop its oldest payload rather than block.
+                    queue.get_nowait()
+                queue.put_nowait(payload)
+
+    @classmethod
+    def _encode_frame(cls, event: StatusEvent) -> bytes:
+        """Return the SSE ``data:`` frame for *event* as UTF-8 bytes."""
+        if orjson is not None:
+            # orjson serializes the dataclass and its datetime natively,
+            # skipping the asdict() deep copy and the pure-Python encoder.
+            return (
+                b"data: "
+                + orjson.dumps(event, option=orjson.OPT_NAIVE_UTC)
+                + b"\n\n"
+            )
+        # Match orjson's output byte for byte: compact separators, raw UTF-8.
+        data = json.dumps(
+            cls._serialize_event(event), separators=(",", ":"), ensure_ascii=False
+        )
+        return f"data: {data}\n\n".encode("utf-8")
+
     @staticmethod
     def _serialize_event(event: StatusEvent) -> dict:
         """Convert a StatusEvent to a JSON-serializable dict."""
         d = asdict(event)
-        d["timestamp"] = event.timestamp.isoformat()
+        del d["_ts_str"]  # render cache, not part of the wire format
+        ts = event.timestamp
+        if ts.tzinfo is None:
+            # Naive timestamps are UTC, as orjson's OPT_NAIVE_UTC assumes.
+            ts = ts.replace(tzinfo=timezone.utc)
+        d["timestamp"] = ts.isoformat()
         return d
+
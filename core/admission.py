@@ -0,0 +1,95 @@
+"""Resizable admission control for outbound HTTP requests.
+
+A drop-in replacement for the :class:`asyncio.Semaphore` that caps
+concurrent feed fetches.  Unlike a semaphore, its limit can be raised or
+lowered at runtime (e.g. to apply backpressure), without touching private
+interpreter state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import TracebackType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """Counter guarded by an :class:`asyncio.Condition`.
+
+    Use as an async context manager around each request.  A caller is
+    admitted while fewer than :attr:`limit` requests are active.
+
+    Parameters
+    ----------
+    limit:
+        Maximum number of concurrently admitted callers (at least 1).
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError(f"limit must be >= 1, got {limit}")
+        self._limit = limit
+        self._active = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current admission limit."""
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        """Number of callers currently admitted."""
+        return self._active
+
+    def locked(self) -> bool:
+        """Return ``True`` when no further caller would be admitted now."""
+        return self._active >= self._limit
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free, then take it."""
+        async with self._cond:
+            try:
+                await self._cond.wait_for(self._has_capacity)
+            except asyncio.CancelledError:
+                # Pass on a wake-up this waiter may have consumed.
+                if self._has_capacity():
+                    self._cond.notify(1)
+                raise
+            self._active += 1
+
+    async def release(self) -> None:
+        """Free a slot and wake one waiter."""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the admission limit; waiters are re-checked immediately.
+
+        Lowering the limit never interrupts admitted callers — it only
+        delays new admissions until enough of them have finished.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be >= 1, got {limit}")
+        async with self._cond:
+            logger.info("Admission limit changed %d -> %d", self._limit, limit)
+            self._limit = limit
+            self._cond.notify_all()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.release()
+
+    def _has_capacity(self) -> bool:
+        return self._active < self._limit
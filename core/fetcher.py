@@ -11,23 +11,61 @@ from __future__ import annotations
 import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Optional
+from types import TracebackType
+from typing import TYPE_CHECKING, Optional, Union
 
 import aiohttp
 
+if TYPE_CHECKING:
+    from core.admission import AdmissionController
+
+try:  # aiohttp only decodes ``br`` bodies when a brotli binding is present.
+    import brotli  # type: ignore[import-not-found]  # noqa: F401
+
+    _HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # type: ignore[import-not-found]  # noqa: F401
+
+        _HAS_BROTLI = True
+    except ImportError:
+        _HAS_BROTLI = False
+
 logger = logging.getLogger(__name__)
 
-_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10, sock_read=15)
+# Atom XML compresses very well; always ask for a compressed body and let
+# aiohttp's auto_decompress undo it.
+_ACCEPT_ENCODING = "gzip, deflate, br" if _HAS_BROTLI else "gzip, deflate"
+
+# (url, etag, last_modified, byte_range) — requests that would be identical
+# on the wire, and so can share one response.
+_RequestKey = tuple[str, Optional[str], Optional[str], Optional[int]]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FetchResult:
-    """Outcome of a single HTTP feed fetch."""
+    """Outcome of a single HTTP feed fetch.
+
+    Frozen, because coalesced fetches hand one instance to every caller.
+    """
 
     status_code: int
-    content: Optional[str]
+    # Raw response body, left undecoded: the parser and the content hash
+    # both want bytes, so decoding to ``str`` here would only be undone.
+    content: Optional[bytes]
     etag: Optional[str]
     last_modified: Optional[str]
+    # Value of the ``Accept-Ranges`` response header, if any.
+    accept_ranges: Optional[str] = None
+
+
+@dataclass(slots=True)
+class _InFlight:
+    """A shared request and the number of callers still awaiting it."""
+
+    task: asyncio.Task[FetchResult]
+    waiters: int = 0
 
 
 class FeedFetcher:
@@ -36,32 +74,113 @@ class FeedFetcher:
     Parameters
     ----------
     semaphore:
-        An :class:`asyncio.Semaphore` that caps the number of concurrent
+        An :class:`~core.admission.AdmissionController` (or a plain
+        :class:`asyncio.Semaphore`) that caps the number of concurrent
         HTTP requests across all providers.
     session:
         A shared :class:`aiohttp.ClientSession` for connection pooling.
+        Its connector should set an explicit ``limit_per_host`` so many
+        providers on one host reuse a small pool of keep-alive
+        connections instead of opening a socket per poll.  The fetcher
+        takes ownership: :meth:`close` (or leaving ``async with``) closes it.
     """
 
     def __init__(
         self,
-        semaphore: asyncio.Semaphore,
+        semaphore: Union[AdmissionController, asyncio.Semaphore],
         session: aiohttp.ClientSession,
     ) -> None:
         self._semaphore = semaphore
         self._session = session
+        self._in_flight: dict[_RequestKey, _InFlight] = {}
+
+    async def close(self) -> None:
+        """Cancel in-flight requests, then close the session and its pool."""
+        tasks = [entry.task for entry in self._in_flight.values()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+        await self._session.close()
+
+    async def __aenter__(self) -> FeedFetcher:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.close()
 
     async def fetch(
         self,
         url: str,
         etag: Optional[str] = None,
         last_modified: Optional[str] = None,
+        byte_range: Optional[int] = None,
     ) -> FetchResult:
         """Fetch *url*, honouring cached *etag* and *last_modified*.
 
+        When *byte_range* is given only the first *byte_range* bytes of the
+        feed are requested; a server that honours it answers ``206 Partial
+        Content``.  Ranged requests ask for an uncompressed body, because a
+        byte slice of a gzip stream cannot be decoded on its own.
+
+        Concurrent calls for the same URL with the same validators and
+        range are coalesced into one HTTP request whose result all callers
+        share, e.g. when several providers point at one feed.  Cancelling
+        one caller leaves the request running for the others; cancelling
+        the last one cancels the request too.
+
         Returns a :class:`FetchResult`.  When the server responds with
-        ``304 Not Modified``, ``content`` will be ``None``.
+        ``304 Not Modified``, ``content`` will be ``None``.  Any other
+        ``4xx``/``5xx`` status raises :class:`aiohttp.ClientResponseError`.
         """
-        headers: dict[str, str] = {}
+        key = (url, etag, last_modified, byte_range)
+        entry = self._in_flight.get(key)
+        if entry is None:
+            task = asyncio.create_task(
+                self._request(url, etag, last_modified, byte_range)
+            )
+            entry = self._in_flight[key] = _InFlight(task)
+            task.add_done_callback(lambda t: self._forget(key, t))
+        entry.waiters += 1
+        try:
+            # Shielded so one caller being cancelled does not fail the others.
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if not entry.waiters and not entry.task.done():
+                # Last caller gone: stop the request rather than leave it
+                # holding an admission slot and a pooled connection.
+                entry.task.cancel()
+                await asyncio.wait([entry.task])
+
+    def _forget(self, key: _RequestKey, task: asyncio.Task[FetchResult]) -> None:
+        entry = self._in_flight.get(key)
+        if entry is not None and entry.task is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved; waiting callers still see it.
+            task.exception()
+
+    async def _request(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        byte_range: Optional[int],
+    ) -> FetchResult:
+        """Perform the HTTP request behind :meth:`fetch`."""
+        headers: dict[str, str] = {"Accept-Encoding": _ACCEPT_ENCODING}
+        if byte_range is not None:
+            headers["Range"] = f"bytes=0-{byte_range - 1}"
+            headers["Accept-Encoding"] = "identity"
+        # Validators stay the str objects aiohttp handed back with the last
+        # response: its header API takes str and encodes once on write, so
+        # storing bytes would only add a decode here on every poll.
         if etag is not None:
             headers["If-None-Match"] = etag
         if last_modified is not None:
@@ -71,7 +190,10 @@ class FeedFetcher:
             async with self._session.get(
                 url, headers=headers, timeout=_REQUEST_TIMEOUT
             ) as response:
-                if response.status == 304:
+                status = response.status
+                if status == 304:
+                    # No body to read and the validators are unchanged:
+                    # hand the caller's strings straight back.
                     return FetchResult(
                         status_code=304,
                         content=None,
@@ -79,10 +201,16 @@ class FeedFetcher:
                         last_modified=last_modified,
                     )
 
-                body = await response.text()
+                # An error page is not the feed: fail the poll so it counts
+                # towards backoff and the circuit breaker, rather than being
+                # parsed and hashed and its validators stored.
+                response.raise_for_status()
+                body = await response.read()
+                response_headers = response.headers
                 return FetchResult(
-                    status_code=response.status,
+                    status_code=status,
                     content=body,
-                    etag=response.headers.get("ETag"),
-                    last_modified=response.headers.get("Last-Modified"),
+                    etag=response_headers.get("ETag"),
+                    last_modified=response_headers.get("Last-Modified"),
+                    accept_ranges=response_headers.get("Accept-Ranges"),
                 )
@@ -1,8 +1,12 @@
 """Atom feed parser for status-page entries.
 
-Wraps the ``feedparser`` library and extracts the fields relevant to
-status monitoring: incident ID, title, last-updated timestamp, and
-summary text (with HTML stripped).
+Extracts the fields relevant to status monitoring: incident ID, title,
+last-updated timestamp, and summary text (with HTML stripped).
+
+Well-formed Atom feeds are streamed through ``lxml.etree.iterparse``,
+discarding each ``<entry>`` once it has been read.  Anything the fast path
+cannot handle (RSS, broken XML, ``lxml`` not installed) falls back to the
+tolerant ``feedparser`` library.
 """
 
 from __future__ import annotations
@@ -11,21 +15,57 @@ import html
 import logging
 import re
 from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Optional, Union
 
 import feedparser  # type: ignore[import-untyped]
 
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - exercised only without lxml
+    etree = None
+
 logger = logging.getLogger(__name__)
 
 _HTML_TAG_RE = re.compile(r"<[^>]+>")
 
-
-def _strip_html(raw: str) -> str:
-    """Remove HTML tags and decode entities from *raw*."""
-    text = _HTML_TAG_RE.sub("", raw)
-    return html.unescape(text).strip()
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ATOM_ENTRY = _ATOM + "entry"
+_ATOM_ID = _ATOM + "id"
+_ATOM_TITLE = _ATOM + "title"
+_ATOM_UPDATED = _ATOM + "updated"
+_ATOM_SUMMARY = _ATOM + "summary"
+_ATOM_CONTENT = _ATOM + "content"
+
+# Parser options for iterparse: tolerate truncated (ranged) feeds, never
+# touch the network or expand entities.
+_ITERPARSE_OPTIONS: dict[str, Any] = {
+    "events": ("end",),
+    "tag": _ATOM_ENTRY,
+    "recover": True,
+    "huge_tree": False,
+    "resolve_entities": False,
+    "no_network": True,
+}
 
 
-@dataclass
+def _strip_html(raw: str) -> str:
+    """Remove HTML tags and decode entities from *raw*.
+
+    Plain-text summaries skip both passes entirely.  (An lxml/selectolax
+    DOM walk and a ``str.split``/``partition`` scan were both measured
+    slower than the compiled regex on typical incident summaries, so the
+    regex stays.  Summaries are a few hundred bytes, too short for a
+    DFA engine such as re2/hyperscan to pay back its call overhead.)
+    """
+    if "<" in raw:
+        raw = _HTML_TAG_RE.sub("", raw)
+    if "&" in raw:
+        raw = html.unescape(raw)
+    return raw.strip()
+
+
+@dataclass(slots=True)
 class ParsedEntry:
     """A single parsed feed entry."""
 
@@ -38,16 +78,94 @@ class ParsedEntry:
 class FeedParser:
     """Stateless parser that converts raw Atom XML into :class:`ParsedEntry` objects."""
 
-    def parse(self, content: str, provider_name: str) -> list[ParsedEntry]:
+    def parse(
+        self, content: Union[str, bytes], provider_name: str
+    ) -> list[ParsedEntry]:
         """Parse *content* (Atom XML) and return a list of entries.
 
         Parameters
         ----------
         content:
-            Raw XML string of the Atom feed.
+            Atom XML, ideally the undecoded response body: bytes go to lxml
+            as-is and let the XML declaration pick the encoding.
         provider_name:
             Used for log messages only.
         """
+        entries = self._parse_atom_fast(content, provider_name)
+        if entries is None:
+            entries = self._parse_with_feedparser(content, provider_name)
+
+        logger.debug(
+            "Parsed %d entries from %s feed", len(entries), provider_name
+        )
+        return entries
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_atom_fast(
+        content: Union[str, bytes],
+        provider_name: str,
+    ) -> Optional[list[ParsedEntry]]:
+        """Parse *content* with lxml; return ``None`` to request the fallback."""
+        if etree is None or not content:
+            return None
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        entries: list[ParsedEntry] = []
+        seen_entry = False
+        try:
+            for _, node in etree.iterparse(BytesIO(content), **_ITERPARSE_OPTIONS):
+                seen_entry = True
+                entry = FeedParser._entry_from_node(node, provider_name)
+                if entry is not None:
+                    entries.append(entry)
+                # Free the finished entry and any earlier siblings so memory
+                # stays flat however long the feed is.
+                node.clear()
+                while node.getprevious() is not None:
+                    del node.getparent()[0]
+        except (etree.XMLSyntaxError, ValueError):
+            return None
+
+        if not seen_entry:
+            # Not an Atom feed (or an empty one) — let feedparser decide.
+            return None
+        return entries
+
+    @staticmethod
+    def _entry_from_node(node: Any, provider_name: str) -> Optional[ParsedEntry]:
+        """Build a :class:`ParsedEntry` from an Atom ``<entry>`` element."""
+        entry_id = (node.findtext(_ATOM_ID) or "").strip()
+        if not entry_id:
+            logger.debug("Skipping entry without id in %s feed", provider_name)
+            return None
+
+        # Prefer the full summary; fall back to content field.
+        raw_summary = ""
+        summary_node = node.find(_ATOM_SUMMARY)
+        if summary_node is None:
+            summary_node = node.find(_ATOM_CONTENT)
+        if summary_node is not None:
+            raw_summary = "".join(summary_node.itertext())
+
+        return ParsedEntry(
+            entry_id=entry_id,
+            title=(node.findtext(_ATOM_TITLE) or "").strip(),
+            updated=(node.findtext(_ATOM_UPDATED) or "").strip(),
+            summary=_strip_html(raw_summary),
+        )
+
+    @staticmethod
+    def _parse_with_feedparser(
+        content: Union[str, bytes],
+        provider_name: str,
+    ) -> list[ParsedEntry]:
+        """Slow-path parse via ``feedparser`` for feeds lxml cannot handle."""
         feed = feedparser.parse(content)
 
         if feed.bozo and not feed.entries:
@@ -87,8 +205,4 @@ class FeedParser:
                     summary=summary,
                 )
             )
-
-        logger.debug(
-            "Parsed %d entries from %s feed", len(entries), provider_name
-        )
         return entries
@@ -1,32 +1,68 @@
-"""Poll scheduler — spawns and manages one async task per provider.
+"""Poll scheduler — drives every provider from a single timer heap.
 
-Each task independently loops: fetch -> parse -> detect changes ->
-publish events -> sleep.  Failures in one provider never affect others.
+One dispatcher task sleeps until the earliest due provider, then starts a
+short-lived poll for it: fetch -> parse -> detect changes -> publish
+events.  When the poll finishes, the provider is pushed back onto the heap
+at its next due time.  Failures in one provider never affect others.
 """
 
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import heapq
 import logging
 import random
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Optional
 
 from core.fetcher import FeedFetcher
-from core.parser import FeedParser
-from core.state import StateManager
+from core.parser import FeedParser, ParsedEntry
+from core.state import StateManager, parse_timestamp, parse_timestamp_ns
 from events.bus import EventBus
 from events.models import StatusEvent
 
 logger = logging.getLogger(__name__)
 
-_STAGGER_DELAY = 0.3  # seconds between task launches
-_MAX_JITTER = 5.0      # max random jitter added to poll interval
+_STAGGER_DELAY = 0.3  # seconds between providers' first polls
 _MAX_BACKOFF_EXP = 5   # cap for the exponent in exponential backoff
+_DEFAULT_MAX_BACKOFF = 300.0  # seconds; ceiling on a failing provider's wait
+_DEFAULT_BREAKER_THRESHOLD = 5  # consecutive failures before polling pauses
+# Jitter is drawn with Random.uniform on each requeue: ~90ns, against a
+# poll that costs milliseconds, so a pre-sampled buffer would not pay.
+_MAX_JITTER = 5.0      # max random jitter added to poll interval
+_BACKOFF_JITTER = 0.1  # backoff is spread by +/- this fraction
+_FEED_HEAD_BYTES = 64 * 1024         # size of a ranged "newest entries" fetch
+# Ranged requests go uncompressed, so they only win for feeds much larger
+# than the head slice (Atom XML gzips roughly 5-10x).
+_RANGE_MIN_FEED_BYTES = 512 * 1024
+
+
+@dataclass(slots=True)
+class _ProviderSlot:
+    """Per-provider polling settings plus its running failure count."""
+
+    name: str
+    product: str
+    feed_url: str
+    interval: float
+    max_backoff: float
+    failure_count: int = 0
+    # Failures since the last success of any kind; trips the breaker.
+    consecutive_failures: int = 0
+    # Loop time of the first success since the last failure, if any.
+    good_since: Optional[float] = None
+    # Whether the first poll since start() has been dispatched.
+    started: bool = False
+    # Open after too many consecutive failures: probed at the ceiling only.
+    breaker_open: bool = False
+    # Sequence number of the slot's live heap entry; 0 while not queued.
+    queued_seq: int = 0
 
 
 class PollScheduler:
-    """Manages the lifecycle of per-provider polling tasks.
+    """Schedules every provider's polls from one dispatcher task.
 
     Parameters
     ----------
@@ -40,6 +76,28 @@ class PollScheduler:
     state_manager:
         Shared :class:`StateManager` that tracks seen entries and caching
         headers.
+    max_backoff_seconds:
+        Ceiling on the wait after consecutive failures, so a provider that
+        was down for a while is re-probed promptly once it recovers.  A
+        provider's ``max_backoff_seconds`` config key overrides it.
+    failure_reset_seconds:
+        How long a failing provider must stay healthy before its failure
+        count is cleared.  Until then a new failure keeps escalating the
+        backoff instead of starting over, so a flapping provider is not
+        hammered.  Defaults to the provider's backoff ceiling.
+    breaker_threshold:
+        Consecutive failures after which a provider's circuit breaker
+        opens: a single ``circuit_open`` event is published, and the
+        provider is then only probed once per backoff ceiling, with terse
+        log lines.  The first successful probe closes the breaker, as does
+        :meth:`reset_breaker`.  ``None`` disables the breaker.
+    rng:
+        Source of poll and backoff jitter.  Defaults to a private
+        :class:`random.Random`; tests pass their own to pin the jitter
+        without patching the global :mod:`random` module.
+    on_provider_started:
+        Optional ``callback(name, loop_time)`` invoked as each provider's
+        first poll after :meth:`start` is dispatched.
     """
 
     def __init__(
@@ -48,83 +106,271 @@ class PollScheduler:
         event_bus: EventBus,
         fetcher: FeedFetcher,
         state_manager: StateManager,
+        max_backoff_seconds: float = _DEFAULT_MAX_BACKOFF,
+        failure_reset_seconds: Optional[float] = None,
+        breaker_threshold: Optional[int] = _DEFAULT_BREAKER_THRESHOLD,
+        rng: Optional[random.Random] = None,
+        on_provider_started: Optional[Callable[[str, float], None]] = None,
     ) -> None:
-        self._providers = providers
+        self._on_provider_started = on_provider_started
+        self._rng = rng if rng is not None else random.Random()
+        self._failure_reset_seconds = failure_reset_seconds
+        self._breaker_threshold = breaker_threshold
         self._event_bus = event_bus
         self._fetcher = fetcher
         self._state_manager = state_manager
         self._parser = FeedParser()
-        self._tasks: list[asyncio.Task[None]] = []
+        self._slots = [
+            _ProviderSlot(
+                name=cfg["name"],
+                product=cfg.get("product", cfg["name"]),
+                feed_url=cfg["feed_url"],
+                interval=cfg.get("poll_interval_seconds", 30),
+                max_backoff=cfg.get("max_backoff_seconds", max_backoff_seconds),
+            )
+            for cfg in providers
+        ]
+        # Min-heap of (due loop time, tie-breaker, slot).  A slot is off the
+        # heap while its poll is in flight, so polls never overlap.
+        self._heap: list[tuple[float, int, _ProviderSlot]] = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
 
     async def start(self) -> None:
-        """Spawn a polling task for every configured provider.
+        """Queue every provider and start the dispatcher in a new task.
 
-        Tasks are started with a small stagger to avoid a thundering-herd
-        of HTTP requests at boot time.
+        Nothing awaits that task, so a crash in the dispatcher only shows up
+        in :meth:`stop`.  Long-running callers should await :meth:`run` from
+        a task group instead.
         """
-        for index, provider_cfg in enumerate(self._providers):
-            if index > 0:
-                await asyncio.sleep(_STAGGER_DELAY)
-            task = asyncio.create_task(
-                self._poll_loop(provider_cfg),
-                name=f"poll-{provider_cfg.get('name', index)}",
-            )
-            self._tasks.append(task)
-            logger.info(
-                "Started polling task for %s (interval=%ss)",
-                provider_cfg.get("name"),
-                provider_cfg.get("poll_interval_seconds"),
-            )
+        self._queue_all()
+        self._task = asyncio.create_task(self._dispatch(), name="poll-scheduler")
+
+    async def run(self) -> None:
+        """Queue every provider and dispatch polls in the current task.
+
+        Runs until cancelled (or :meth:`stop` is called).  Meant to be a
+        :class:`asyncio.TaskGroup` child: if the dispatcher dies, the error
+        propagates to the group instead of polling stopping silently.
+        """
+        self._queue_all()
+        self._task = asyncio.current_task()
+        await self._dispatch()
 
     async def stop(self) -> None:
-        """Cancel all running polling tasks and wait for them to finish."""
-        for task in self._tasks:
+        """Cancel the dispatcher — and with it every in-flight poll — and wait.
+
+        In-flight polls are children of the dispatcher's task group, so
+        cancelling the dispatcher cancels and awaits all of them before
+        this returns; none can outlive the scheduler.
+        """
+        task, self._task = self._task, None
+        if task is not None:
             task.cancel()
-        results = await asyncio.gather(*self._tasks, return_exceptions=True)
-        for task, result in zip(self._tasks, results):
-            if isinstance(result, Exception) and not isinstance(
-                result, asyncio.CancelledError
-            ):
+            await asyncio.wait([task])
+            if not task.cancelled() and task.exception() is not None:
                 logger.error(
-                    "Task %s raised during shutdown: %s", task.get_name(), result
+                    "Task %s raised during shutdown: %s",
+                    task.get_name(),
+                    task.exception(),
                 )
-        self._tasks.clear()
+        self._heap.clear()
         logger.info("All polling tasks stopped")
 
+    def reset_breaker(self, name: str) -> bool:
+        """Close *name*'s circuit breaker and probe it again right away.
+
+        Returns ``False`` when no provider called *name* has an open breaker.
+        """
+        slot = next(
+            (s for s in self._slots if s.name == name and s.breaker_open), None
+        )
+        if slot is None:
+            return False
+        slot.breaker_open = False
+        slot.failure_count = 0
+        slot.consecutive_failures = 0
+        slot.good_since = None
+        logger.info("Circuit breaker for %s reset — resuming polling", name)
+        if self._task is not None and slot.queued_seq:
+            # Supersede the pending probe; a poll already in flight
+            # requeues the slot itself when it finishes.
+            self._push(slot, asyncio.get_running_loop().time())
+        return True
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
-    async def _poll_loop(self, provider_cfg: dict[str, Any]) -> None:
-        """Infinite polling loop for a single provider."""
-        name: str = provider_cfg["name"]
-        product: str = provider_cfg.get("product", name)
-        feed_url: str = provider_cfg["feed_url"]
-        base_interval: int = provider_cfg.get("poll_interval_seconds", 30)
-        failure_count = 0
+    def _queue_all(self) -> None:
+        """Queue every provider's first poll.
 
-        while True:
-            try:
-                await self._poll_once(name, product, feed_url)
-                failure_count = 0
-                sleep_time = base_interval + random.uniform(0, _MAX_JITTER)
-            except asyncio.CancelledError:
-                logger.info("Polling task for %s cancelled", name)
-                raise
-            except Exception:
-                failure_count += 1
-                backoff = base_interval * (
-                    2 ** min(failure_count, _MAX_BACKOFF_EXP)
+        First polls are staggered by :data:`_STAGGER_DELAY` to avoid a
+        thundering herd of HTTP requests at boot time.
+        """
+        now = asyncio.get_running_loop().time()
+        for index, slot in enumerate(self._slots):
+            slot.started = False
+            self._push(slot, now + index * _STAGGER_DELAY)
+            logger.info(
+                "Scheduled polling for %s (interval=%ss)", slot.name, slot.interval
+            )
+
+    def _push(self, slot: _ProviderSlot, due: float) -> None:
+        """Queue *slot* to be polled at loop time *due*.
+
+        Any entry already queued for *slot* is superseded and skipped when
+        it reaches the top of the heap.
+        """
+        self._seq += 1
+        slot.queued_seq = self._seq
+        heapq.heappush(self._heap, (due, self._seq, slot))
+        self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        """Start each provider's poll when it falls due; runs until cancelled.
+
+        Polls run as children of a :class:`asyncio.TaskGroup`, so cancelling
+        this coroutine cancels every in-flight poll and waits for them.
+        """
+        loop = asyncio.get_running_loop()
+        async with asyncio.TaskGroup() as polls:
+            while True:
+                self._wakeup.clear()
+                if not self._heap:
+                    await self._wakeup.wait()
+                    continue
+                delay = self._heap[0][0] - loop.time()
+                if delay > 0:
+                    # Sleep until the earliest entry is due, or until a
+                    # finished poll pushes one that may be due sooner.
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except TimeoutError:
+                        pass
+                    continue
+                _, seq, slot = heapq.heappop(self._heap)
+                if seq != slot.queued_seq:
+                    continue  # superseded by a later _push()
+                slot.queued_seq = 0
+                if not slot.started:
+                    slot.started = True
+                    if self._on_provider_started is not None:
+                        self._on_provider_started(slot.name, loop.time())
+                polls.create_task(
+                    self._poll_provider(slot), name=f"poll-{slot.name}"
                 )
-                sleep_time = backoff + random.uniform(0, _MAX_JITTER)
+
+    async def _poll_provider(self, slot: _ProviderSlot) -> float:
+        """Poll *slot* once and requeue it; return the delay until the next poll.
+
+        A success waits the base interval, and clears the failure count
+        once the provider has been healthy for ``failure_reset_seconds``.
+        Each failure doubles the wait (exponential backoff), up to
+        the slot's ``max_backoff`` — never less than the base interval —
+        spread by ±10% so recovering providers are not all re-probed at once.
+        While the slot's circuit breaker is open every retry waits the full
+        ceiling.
+
+        The slot is requeued however the poll ends.  A ``CancelledError``
+        can escape a shared fetch whose request was cancelled under it;
+        without the requeue the provider would never be polled again.
+        """
+        loop = asyncio.get_running_loop()
+        delay = float(slot.interval)  # if the poll is cut short by cancellation
+        try:
+            await self._poll_once(slot.name, slot.product, slot.feed_url)
+            slot.consecutive_failures = 0
+            if slot.breaker_open:
+                slot.breaker_open = False
+                logger.info("%s reachable again — circuit breaker closed", slot.name)
+            if slot.failure_count:
+                self._note_success(slot, loop.time())
+            delay = slot.interval + self._rng.uniform(0, _MAX_JITTER)
+        except asyncio.CancelledError:
+            logger.info("Polling task for %s cancelled", slot.name)
+            raise
+        except Exception as exc:
+            slot.good_since = None
+            slot.failure_count += 1
+            slot.consecutive_failures += 1
+            ceiling = max(slot.max_backoff, slot.interval)
+            if slot.breaker_open:
+                backoff = ceiling
+            else:
+                backoff = min(
+                    slot.interval * 2 ** min(slot.failure_count, _MAX_BACKOFF_EXP),
+                    ceiling,
+                )
+            jitter = self._rng.uniform(-_BACKOFF_JITTER, _BACKOFF_JITTER)
+            delay = backoff * (1 + jitter)
+            if slot.breaker_open:
+                # Already announced; one line per probe, no traceback.
+                logger.warning(
+                    "%s still failing (circuit open, next probe in %.1fs): %s",
+                    slot.name,
+                    delay,
+                    exc,
+                )
+            else:
                 logger.exception(
                     "Error polling %s (failure #%d, backing off %.1fs)",
-                    name,
-                    failure_count,
-                    sleep_time,
+                    slot.name,
+                    slot.failure_count,
+                    delay,
                 )
+                if (
+                    self._breaker_threshold is not None
+                    and slot.consecutive_failures >= self._breaker_threshold
+                ):
+                    await self._open_breaker(slot, ceiling)
+        finally:
+            self._push(slot, loop.time() + delay)
+        return delay
 
-            await asyncio.sleep(sleep_time)
+    async def _open_breaker(
+        self, slot: _ProviderSlot, probe_interval: float
+    ) -> None:
+        """Mark *slot*'s breaker open and announce it once on the event bus."""
+        slot.breaker_open = True
+        logger.error(
+            "Circuit breaker opened for %s after %d consecutive failures — "
+            "probing every %.0fs until it recovers",
+            slot.name,
+            slot.consecutive_failures,
+            probe_interval,
+        )
+        await self._event_bus.publish(
+            StatusEvent(
+                provider=slot.name,
+                product=slot.product,
+                status="Feed unreachable",
+                message=(
+                    f"Feed failed {slot.consecutive_failures} consecutive "
+                    f"polls; retrying every {probe_interval:.0f}s until it recovers."
+                ),
+                timestamp=datetime.now(tz=timezone.utc),
+                incident_id=f"circuit-open:{slot.name}",
+                event_type="circuit_open",
+            )
+        )
+
+    def _note_success(self, slot: _ProviderSlot, now: float) -> None:
+        """Clear *slot*'s failure count once it has been healthy long enough."""
+        if slot.good_since is None:
+            slot.good_since = now
+        threshold = self._failure_reset_seconds
+        if threshold is None:
+            threshold = slot.max_backoff
+        if now - slot.good_since >= threshold:
+            logger.info(
+                "%s healthy again — clearing %d failure(s)",
+                slot.name,
+                slot.failure_count,
+            )
+            slot.failure_count = 0
+            slot.good_since = None
 
     async def _poll_once(self, name: str, product: str, feed_url: str) -> None:
         """Execute a single fetch-parse-publish cycle for *name*."""
@@ -132,10 +378,16 @@ class PollScheduler:
 
         logger.info("Polling %s — %s", name, feed_url)
 
+        use_range = (
+            state.accept_ranges == "bytes"
+            and state.content_length is not None
+            and state.content_length >= _RANGE_MIN_FEED_BYTES
+        )
         result = await self._fetcher.fetch(
             url=feed_url,
             etag=state.etag,
             last_modified=state.last_modified,
+            byte_range=_FEED_HEAD_BYTES if use_range else None,
         )
 
         if result.status_code == 304:
@@ -149,35 +401,72 @@ class PollScheduler:
             len(result.content) if result.content else 0,
         )
 
-        # Update caching headers regardless of whether content changed.
-        self._state_manager.update_etag(name, result.etag, result.last_modified)
-
         if result.content is None:
+            self._state_manager.update_etag(name, result.etag, result.last_modified)
             return
 
-        entries = self._parser.parse(result.content, name)
+        partial = result.status_code == 206
+        if not partial:
+            self._state_manager.update_range_support(
+                name, result.accept_ranges, len(result.content)
+            )
+
+        content_hash = hashlib.blake2b(result.content, digest_size=16).digest()
+        if content_hash == state.content_hash:
+            logger.info("%s: body unchanged — skipping parse", name)
+            self._state_manager.update_etag(name, result.etag, result.last_modified)
+            return
+
+        # Parsing is CPU-bound; run it off the event loop so other providers'
+        # polls and SSE writes keep flowing while a large feed is parsed.
+        entries = await asyncio.to_thread(
+            self._parser.parse, result.content, name
+        )
 
+        if partial:
+            # The slice ends mid-document, so the last entry may be cut off.
+            entries = entries[:-1]
+            if not entries:
+                logger.info(
+                    "%s: feed head had no complete entries — refetching in full",
+                    name,
+                )
+                # Forget the validators too, or the full request would 304.
+                self._state_manager.update_range_support(name, None, None)
+                self._state_manager.update_etag(name, None, None)
+                await self._poll_once(name, product, feed_url)
+                return
+
+        # Diff the whole feed against the seen map in one pass: one dict
+        # lookup per entry, then a single batched state update.
+        seen = state.seen_entries
+        changes: dict[str, tuple[ParsedEntry, str]] = {}
         for entry in entries:
-            changed, change_type = self._state_manager.is_new_or_updated(
-                name, entry.entry_id, entry.updated
-            )
-            if not changed:
+            previous = seen.get(entry.entry_id)
+            if (
+                previous == parse_timestamp_ns(entry.updated)
+                or entry.entry_id in changes
+            ):
                 continue
+            change_type = "new" if previous is None else "updated"
+            changes[entry.entry_id] = (entry, change_type)
 
-            self._state_manager.mark_seen(name, entry.entry_id, entry.updated)
-
-            # Parse the updated timestamp; fall back to now if unparseable.
-            try:
-                timestamp = datetime.fromisoformat(entry.updated)
-            except (ValueError, TypeError):
-                timestamp = datetime.now(tz=timezone.utc)
+        if not changes:
+            logger.info("%s: no new or updated entries", name)
+        else:
+            self._state_manager.mark_seen_many(
+                name, {eid: entry.updated for eid, (entry, _) in changes.items()}
+            )
 
+        for entry, change_type in changes.values():
             event = StatusEvent(
                 provider=name,
                 product=f"{product} - {entry.title}",
                 status=entry.title,
                 message=entry.summary,
-                timestamp=timestamp,
+                timestamp=(
+                    parse_timestamp(entry.updated) or datetime.now(tz=timezone.utc)
+                ),
                 incident_id=entry.entry_id,
                 event_type=change_type,  # type: ignore[arg-type]
             )
@@ -195,3 +484,9 @@ class PollScheduler:
                 event.status,
                 event.message,
             )
+
+        # Only remember the body and its validators once every entry has been
+        # recorded, so a failure or crash mid-cycle is retried with a full GET
+        # on the next poll instead of being answered 304.
+        self._state_manager.update_content_hash(name, content_hash)
+        self._state_manager.update_etag(name, result.etag, result.last_modified)
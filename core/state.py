@@ -3,43 +3,157 @@
 Tracks per-provider HTTP caching headers (ETag / Last-Modified) and
 previously seen feed entries so the system can detect new and updated
 incidents without re-emitting duplicates.
+
+State can optionally be snapshotted to disk with ``msgpack`` so a restart
+resumes with warm caching headers and does not re-announce every
+incident already in the feeds.  Changes made between snapshots are
+appended to a small journal next to the snapshot and replayed on load, so
+a crash loses nothing the process had already recorded.
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import logging
+import os
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+import msgpack
+
+try:
+    from ciso8601 import parse_datetime as _parse_iso8601
+except ImportError:  # pragma: no cover - exercised only without ciso8601
+    _parse_iso8601 = None
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_MAX_SEEN_ENTRIES = 10_000  # per provider
+_DEFAULT_SNAPSHOT_INTERVAL = 30.0   # seconds between state snapshots
+_JOURNAL_SUFFIX = ".journal"       # appended to the snapshot file name
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse an Atom ``<updated>`` value into an aware datetime.
+
+    The one ISO 8601 parser for entry timestamps, so change detection and
+    event timestamps always agree.  Uses the C ``ciso8601`` parser when
+    installed.  Naive timestamps are taken as UTC; returns ``None`` for
+    values that are not ISO 8601.  Cached, because a feed repeats the same
+    few timestamps on every poll.
+    """
+    try:
+        if _parse_iso8601 is not None:
+            ts = _parse_iso8601(value)
+        else:
+            ts = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
 
-@dataclass
+
+def parse_timestamp_ns(value: str) -> int:
+    """Return an entry's ``updated`` string as integer epoch nanoseconds.
+
+    Seen entries are stored as these ints: smaller than the strings, and
+    compared with one machine-word check.  Values that
+    :func:`parse_timestamp` rejects map to a stable 64-bit hash so a change
+    is still detected.
+    """
+    ts = parse_timestamp(value)
+    if ts is None:
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+    delta = ts - _EPOCH
+    return (
+        (delta.days * 86_400 + delta.seconds) * 1_000_000_000
+        + delta.microseconds * 1_000
+    )
+
+
+@dataclass(slots=True)
 class ProviderState:
-    """Mutable state kept for a single status-page provider."""
+    """Mutable state kept for a single status-page provider.
+
+    Slotted, so an instance carries no per-object ``__dict__``.
+    """
 
     etag: Optional[str] = None
     last_modified: Optional[str] = None
-    # Mapping of entry_id -> updated timestamp string.
-    seen_entries: dict[str, str] = field(default_factory=dict)
+    # Fingerprint of the last 200 response body, for servers that ignore
+    # conditional headers and resend identical bytes.
+    content_hash: Optional[bytes] = None
+    # Whether the server supports byte ranges, and the decoded size of the
+    # last full body — used to decide when fetching just the feed head pays.
+    accept_ranges: Optional[str] = None
+    content_length: Optional[int] = None
+    # Mapping of entry_id -> updated timestamp (see parse_timestamp_ns),
+    # least recently written first so the oldest entries can be evicted.
+    seen_entries: OrderedDict[str, int] = field(default_factory=OrderedDict)
 
 
 class StateManager:
     """Centralised store for all provider states.
 
     All access is synchronous because state is modified only from the
-    owning asyncio task (one task per provider), so no locking is needed.
+    event loop and each provider has at most one poll in flight, so no
+    locking is needed.
+
+    Parameters
+    ----------
+    max_seen_entries:
+        Upper bound on remembered entries per provider.  Past it, the
+        least recently written entry is evicted, keeping memory bounded for
+        feeds with rotating incident IDs.  Live feeds carry far fewer
+        entries than this, so only long-gone incidents are ever dropped.
+    snapshot_path:
+        Optional file used by :meth:`save` / :meth:`run_snapshots`.  When it
+        exists at construction time, state is restored from it.  Seen
+        entries and caching headers recorded since the last snapshot are
+        journaled to ``<snapshot_path>.journal`` and replayed on top.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_seen_entries: int = _DEFAULT_MAX_SEEN_ENTRIES,
+        snapshot_path: Optional[Path] = None,
+    ) -> None:
         self._states: dict[str, ProviderState] = {}
+        self._max_seen_entries = max_seen_entries
+        self._snapshot_path = snapshot_path
+        self._journal_path: Optional[Path] = None
+        self._journal: Optional[BinaryIO] = None
+        # Records journaled while a snapshot is being written; once it lands
+        # they are all the journal needs to keep.
+        self._journal_tail: Optional[list[bytes]] = None
+        if snapshot_path is not None:
+            self._journal_path = snapshot_path.with_name(
+                snapshot_path.name + _JOURNAL_SUFFIX
+            )
+            if snapshot_path.exists():
+                self._load(snapshot_path)
+            if self._journal_path.exists():
+                self._replay_journal(self._journal_path)
 
     def get_state(self, provider_name: str) -> ProviderState:
         """Return the state for *provider_name*, creating it if absent."""
-        if provider_name not in self._states:
+        # Hits vastly outnumber misses: one lookup, and no throwaway
+        # ProviderState as dict.setdefault() would allocate on every call.
+        try:
+            return self._states[provider_name]
+        except KeyError:
             logger.debug("Initialising state for provider %s", provider_name)
-            self._states[provider_name] = ProviderState()
-        return self._states[provider_name]
+            state = self._states[provider_name] = ProviderState()
+            return state
 
     def update_etag(
         self,
@@ -51,6 +165,7 @@ class StateManager:
         state = self.get_state(provider_name)
         state.etag = etag
         state.last_modified = last_modified
+        self._append_journal(("etag", provider_name, etag, last_modified))
         logger.debug(
             "Updated caching headers for %s — etag=%s, last_modified=%s",
             provider_name,
@@ -58,6 +173,23 @@ class StateManager:
             last_modified,
         )
 
+    def update_content_hash(
+        self, provider_name: str, content_hash: Optional[bytes]
+    ) -> None:
+        """Record the fingerprint of the latest feed body for *provider_name*."""
+        self.get_state(provider_name).content_hash = content_hash
+
+    def update_range_support(
+        self,
+        provider_name: str,
+        accept_ranges: Optional[str],
+        content_length: Optional[int],
+    ) -> None:
+        """Record range support and full body size for *provider_name*."""
+        state = self.get_state(provider_name)
+        state.accept_ranges = accept_ranges
+        state.content_length = content_length
+
     def is_new_or_updated(
         self, provider_name: str, entry_id: str, updated: str
     ) -> tuple[bool, str]:
@@ -71,9 +203,10 @@ class StateManager:
             (empty string when nothing changed).
         """
         state = self.get_state(provider_name)
+        updated_ns = parse_timestamp_ns(updated)
         if entry_id not in state.seen_entries:
             return True, "new"
-        if state.seen_entries[entry_id] != updated:
+        if state.seen_entries[entry_id] != updated_ns:
             return True, "updated"
         return False, ""
 
@@ -81,5 +214,172 @@ class StateManager:
         self, provider_name: str, entry_id: str, updated: str
     ) -> None:
         """Record *entry_id* with its *updated* timestamp as seen."""
-        state = self.get_state(provider_name)
-        state.seen_entries[entry_id] = updated
+        self.mark_seen_many(provider_name, {entry_id: updated})
+
+    def mark_seen_many(
+        self, provider_name: str, entries: dict[str, str]
+    ) -> None:
+        """Record every ``entry_id -> updated`` pair in *entries* as seen."""
+        pairs = [
+            (entry_id, parse_timestamp_ns(updated))
+            for entry_id, updated in entries.items()
+        ]
+        self._apply_seen(self.get_state(provider_name), pairs)
+        self._append_journal(("seen", provider_name, pairs))
+
+    def _apply_seen(
+        self, state: ProviderState, pairs: list[tuple[str, int]]
+    ) -> None:
+        seen = state.seen_entries
+        for entry_id, updated_ns in pairs:
+            if entry_id in seen:
+                seen.move_to_end(entry_id)
+            seen[entry_id] = updated_ns
+        while len(seen) > self._max_seen_entries:
+            seen.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    async def save(self) -> None:
+        """Write a snapshot of all provider states to ``snapshot_path``.
+
+        Packing happens on the event loop (where state is mutated); only the
+        file write is pushed to a worker thread.  Once the snapshot is in
+        place the journal is cut back to the records written since packing.
+        """
+        if self._snapshot_path is None:
+            return
+        data = msgpack.packb(self._pack(), use_bin_type=True)
+        self._journal_tail = []
+        try:
+            await asyncio.to_thread(self._write_atomic, self._snapshot_path, data)
+        finally:
+            tail, self._journal_tail = self._journal_tail, None
+        self._reset_journal(tail)
+        logger.debug(
+            "Saved state snapshot (%d bytes) to %s", len(data), self._snapshot_path
+        )
+
+    async def run_snapshots(
+        self, interval: float = _DEFAULT_SNAPSHOT_INTERVAL
+    ) -> None:
+        """Save a snapshot every *interval* seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.save()
+            except OSError:
+                logger.exception("Failed to save state snapshot")
+
+    def close(self) -> None:
+        """Close the journal file; later changes reopen it as needed."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _append_journal(self, record: tuple[Any, ...]) -> None:
+        """Append *record* to the journal, if persistence is enabled.
+
+        Written synchronously: a buffered append plus flush hands the bytes
+        to the OS in microseconds.  There is no fsync, so a record survives
+        a process crash but not a power cut.  Failures are logged, never
+        raised — losing a journal record must not fail a poll.
+        """
+        if self._journal_path is None:
+            return
+        data = msgpack.packb(record, use_bin_type=True)
+        if self._journal_tail is not None:
+            self._journal_tail.append(data)
+        try:
+            if self._journal is None:
+                self._journal = open(self._journal_path, "ab")
+            self._journal.write(data)
+            self._journal.flush()
+        except OSError as exc:
+            logger.warning("Failed to append to state journal: %s", exc)
+
+    def _reset_journal(self, records: list[bytes]) -> None:
+        """Replace the journal's contents with *records*."""
+        assert self._journal_path is not None
+        self.close()
+        try:
+            self._journal = open(self._journal_path, "wb")
+            self._journal.write(b"".join(records))
+            self._journal.flush()
+        except OSError as exc:
+            logger.warning("Failed to reset state journal: %s", exc)
+
+    def _replay_journal(self, path: Path) -> None:
+        """Apply every complete record in the journal at *path*.
+
+        A record cut short by a crash ends the replay quietly; anything
+        unreadable stops it with a warning, keeping what was applied.
+        """
+        count = 0
+        try:
+            unpacker = msgpack.Unpacker(raw=False)
+            unpacker.feed(path.read_bytes())
+            for op, provider_name, *args in unpacker:
+                state = self.get_state(provider_name)
+                if op == "seen":
+                    self._apply_seen(state, args[0])
+                elif op == "etag":
+                    state.etag, state.last_modified = args
+                count += 1
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning(
+                "Stopped replaying state journal %s after %d record(s): %s",
+                path,
+                count,
+                exc,
+            )
+        if count:
+            logger.info("Replayed %d record(s) from state journal %s", count, path)
+
+    def _pack(self) -> dict[str, Any]:
+        return {
+            name: {
+                "etag": state.etag,
+                "last_modified": state.last_modified,
+                "content_hash": state.content_hash,
+                "seen_entries": list(state.seen_entries.items()),
+            }
+            for name, state in self._states.items()
+        }
+
+    def _load(self, path: Path) -> None:
+        try:
+            raw = msgpack.unpackb(path.read_bytes(), raw=False)
+            for name, fields in raw.items():
+                self._states[name] = ProviderState(
+                    etag=fields.get("etag"),
+                    last_modified=fields.get("last_modified"),
+                    content_hash=fields.get("content_hash"),
+                    seen_entries=OrderedDict(
+                        # Snapshots from before int timestamps hold strings.
+                        (
+                            entry_id,
+                            parse_timestamp_ns(updated)
+                            if isinstance(updated, str)
+                            else updated,
+                        )
+                        for entry_id, updated in fields.get("seen_entries", [])
+                    ),
+                )
+        except (OSError, ValueError, TypeError, AttributeError) as exc:
+            logger.warning(
+                "Ignoring unreadable state snapshot %s: %s", path, exc
+            )
+            self._states.clear()
+            return
+        logger.info(
+            "Restored state for %d provider(s) from %s", len(self._states), path
+        )
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
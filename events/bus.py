@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from typing import AsyncGenerator
 
 from events.models import StatusEvent
 
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CAPACITY = 1024  # max pending events per subscriber
+
 
 class EventBus:
     """Fan-out event bus backed by :class:`asyncio.Queue`.
@@ -12,17 +17,26 @@ class EventBus:
     Every call to :meth:`subscribe` creates a dedicated queue.  When an event
     is published via :meth:`publish`, it is placed into **every** subscriber
     queue so that multiple independent consumers each receive a copy.
+
+    Subscriber queues are bounded by *capacity*.  Publishing never blocks:
+    when a subscriber falls behind and its queue is full, the oldest pending
+    event is dropped to make room for the new one, so one slow consumer
+    cannot stall the producers or the other consumers.
     """
 
-    def __init__(self) -> None:
-        self._subscriber_queues: list[asyncio.Queue[StatusEvent]] = []
-        self._lock = asyncio.Lock()
+    def __init__(self, capacity: int = _DEFAULT_CAPACITY) -> None:
+        self._capacity = capacity
+        # Keyed by id(queue) for O(1) unsubscribe.  No lock is needed: all
+        # access happens on the event loop thread, and publish never awaits
+        # while iterating, so the dict cannot change underneath it.
+        self._subscriber_queues: dict[int, asyncio.Queue[StatusEvent]] = {}
+        # Set whenever a subscriber registers; see wait_for_subscribers().
+        self._subscribed = asyncio.Event()
 
     async def publish(self, event: StatusEvent) -> None:
-        """Broadcast *event* to all current subscribers."""
-        async with self._lock:
-            for queue in self._subscriber_queues:
-                await queue.put(event)
+        """Broadcast *event* to all current subscribers without blocking."""
+        for queue in self._subscriber_queues.values():
+            self._offer(queue, event)
 
     async def subscribe(self) -> AsyncGenerator[StatusEvent, None]:
         """Create a new subscription and yield events as they arrive.
@@ -31,17 +45,73 @@ class EventBus:
         next event is published.  It is safe to have many concurrent
         subscriptions — each one receives every event independently.
         """
-        queue: asyncio.Queue[StatusEvent] = asyncio.Queue()
-        async with self._lock:
-            self._subscriber_queues.append(queue)
+        queue = self._register()
         try:
             while True:
                 event = await queue.get()
                 yield event
         finally:
-            async with self._lock:
-                self._subscriber_queues.remove(queue)
+            self._unregister(queue)
+
+    async def subscribe_batches(
+        self, max_batch: int = 64, window: float = 0.0
+    ) -> AsyncGenerator[list[StatusEvent], None]:
+        """Like :meth:`subscribe`, but yield lists of pending events.
+
+        After the first event arrives the generator waits *window* seconds
+        (if non-zero) and then drains up to *max_batch* queued events
+        without blocking, so a burst can be handled with a single write.
+        """
+        queue = self._register()
+        try:
+            while True:
+                batch = [await queue.get()]
+                if window > 0:
+                    await asyncio.sleep(window)
+                while len(batch) < max_batch:
+                    try:
+                        batch.append(queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                yield batch
+        finally:
+            self._unregister(queue)
 
     def size(self) -> int:
         """Return the number of active subscriber queues."""
         return len(self._subscriber_queues)
+
+    async def wait_for_subscribers(self, n: int = 1) -> None:
+        """Block until at least *n* subscribers are registered.
+
+        Lets a producer (or a test) start publishing only once its
+        consumers are listening, instead of sleeping and hoping.
+        """
+        while len(self._subscriber_queues) < n:
+            self._subscribed.clear()
+            await self._subscribed.wait()
+
+    def _register(self) -> asyncio.Queue[StatusEvent]:
+        queue: asyncio.Queue[StatusEvent] = asyncio.Queue(maxsize=self._capacity)
+        self._subscriber_queues[id(queue)] = queue
+        self._subscribed.set()
+        return queue
+
+    def _unregister(self, queue: asyncio.Queue[StatusEvent]) -> None:
+        self._subscriber_queues.pop(id(queue), None)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue[StatusEvent], event: StatusEvent) -> None:
+        """Put *event* on *queue*, dropping the oldest event if it is full."""
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                dropped = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                dropped = None
+            queue.put_nowait(event)
+            logger.warning(
+                "Subscriber queue full — dropped event %s",
+                dropped.incident_id if dropped is not None else "<none>",
+            )
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Literal
 
 
-@dataclass(frozen=True)
+def _format_timestamp(ts: datetime) -> str:
+    """Return *ts* as ``YYYY-MM-DD HH:MM:SS``.
+
+    Equivalent to ``strftime("%Y-%m-%d %H:%M:%S")`` for four-digit years,
+    but ``isoformat`` stays in C and skips the libc/locale round trip,
+    which roughly halves the cost per event.
+    """
+    return ts.isoformat(" ", "seconds")[:19]
+
+
+@dataclass(frozen=True, slots=True)
 class StatusEvent:
     """Represents a single status event emitted by a provider scraper."""
 
@@ -15,13 +25,17 @@ class StatusEvent:
     message: str
     timestamp: datetime
     incident_id: str
-    event_type: Literal["new", "updated"]
+    event_type: Literal["new", "updated", "circuit_open"]
+    # Formatted once here so every consumer that renders the event reuses it.
+    _ts_str: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_ts_str", _format_timestamp(self.timestamp))
 
     def formatted_output(self) -> str:
         """Return a human-readable log line for this event."""
-        ts = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
         return (
-            f"[{ts}] Product: {self.provider} - {self.product}\n"
+            f"[{self._ts_str}] Product: {self.provider} - {self.product}\n"
             f"  Status: {self.status} {self.message}"
         )
 
@@ -2,28 +2,34 @@
 
 Loads provider configuration, wires up all components, and runs the
 async polling loop until interrupted with Ctrl+C.
+
+Heavy dependencies (``aiohttp``, ``yaml`` and the component packages) are
+imported inside the functions that use them, so importing this module —
+e.g. from tests — stays cheap.
 """
 
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
+import os
 import signal
 import sys
+from collections import OrderedDict
 from pathlib import Path
 
-import aiohttp
-import yaml
-
-from core.fetcher import FeedFetcher
-from core.scheduler import PollScheduler
-from core.state import StateManager
-from events.bus import EventBus
-from consumers.console import ConsoleConsumer
-from consumers.sse import SSEConsumer
-
 _CONFIG_PATH = Path(__file__).parent / "config" / "providers.yaml"
+_STATE_PATH = Path(__file__).parent / "state.mpk"
 _MAX_CONCURRENT_REQUESTS = 20
+_MAX_CONNECTIONS_PER_HOST = 4
+_DNS_CACHE_TTL = 300        # seconds
+_MIN_KEEPALIVE_TIMEOUT = 75  # seconds an idle pooled connection is kept
+_YAML_CACHE_SIZE = 16
+_EVENT_BUS_CAPACITY = 1024  # pending events per subscriber before drop-oldest
+
+# path -> (st_mtime_ns, st_size, providers); validated with a stat() per load.
+_YAML_CACHE: OrderedDict[str, tuple[int, int, list[dict]]] = OrderedDict()
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,26 +40,79 @@ logger = logging.getLogger(__name__)
 
 
 def _load_providers(path: Path) -> list[dict]:
-    """Read the YAML provider registry and return the provider list."""
-    with open(path) as fh:
-        config = yaml.safe_load(fh)
+    """Read the YAML provider registry and return the provider list.
+
+    Parsed results are cached by path and validated against the file's
+    mtime and size, so reloading an unchanged file costs one ``stat()``.
+    Callers always get a fresh copy they are free to mutate.
+    """
+    key = str(path)
+    st = os.stat(path)
+    cached = _YAML_CACHE.get(key)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        _YAML_CACHE.move_to_end(key)
+        return copy.deepcopy(cached[2])
+
+    import yaml
+
+    try:  # libyaml-backed C loader; pure-Python fallback when not compiled in.
+        from yaml import CSafeLoader as Loader
+    except ImportError:  # pragma: no cover - depends on the PyYAML build
+        from yaml import SafeLoader as Loader  # type: ignore[assignment]
+
+    # One read into bytes lets libyaml parse from an in-memory buffer instead
+    # of pulling the file through Python read() callbacks; an empty file
+    # loads as None.
+    config = yaml.load(path.read_bytes(), Loader=Loader) or {}
     providers = config.get("providers", [])
     logger.info("Loaded %d provider(s) from %s", len(providers), path)
-    return providers
+
+    _YAML_CACHE[key] = (st.st_mtime_ns, st.st_size, providers)
+    _YAML_CACHE.move_to_end(key)
+    while len(_YAML_CACHE) > _YAML_CACHE_SIZE:
+        _YAML_CACHE.popitem(last=False)
+    return copy.deepcopy(providers)
 
 
 async def main() -> None:
+    import aiohttp
+
+    from consumers.console import ConsoleConsumer
+    from consumers.sse import SSEConsumer
+    from core.admission import AdmissionController
+    from core.fetcher import FeedFetcher
+    from core.scheduler import PollScheduler
+    from core.state import StateManager
+    from events.bus import EventBus
+
     providers = _load_providers(_CONFIG_PATH)
     if not providers:
         logger.error("No providers configured — exiting")
         sys.exit(1)
 
-    event_bus = EventBus()
-    state_manager = StateManager()
-    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
-
-    async with aiohttp.ClientSession() as session:
-        fetcher = FeedFetcher(semaphore=semaphore, session=session)
+    event_bus = EventBus(capacity=_EVENT_BUS_CAPACITY)
+    state_manager = StateManager(snapshot_path=_STATE_PATH)
+    admission = AdmissionController(_MAX_CONCURRENT_REQUESTS)
+
+    # Keep idle connections alive across two poll intervals so each poll
+    # reuses a warm connection instead of paying a fresh TCP + TLS handshake.
+    keepalive_timeout = max(
+        _MIN_KEEPALIVE_TIMEOUT,
+        2 * max(p.get("poll_interval_seconds", 30) for p in providers),
+    )
+    connector = aiohttp.TCPConnector(
+        limit=_MAX_CONCURRENT_REQUESTS,
+        limit_per_host=_MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=_DNS_CACHE_TTL,
+        keepalive_timeout=keepalive_timeout,
+        enable_cleanup_closed=True,
+    )
+
+    # One session, one connection pool, shared by every provider's polls.
+    async with FeedFetcher(
+        semaphore=admission,
+        session=aiohttp.ClientSession(connector=connector),
+    ) as fetcher:
         scheduler = PollScheduler(
             providers=providers,
             event_bus=event_bus,
@@ -61,35 +120,80 @@ async def main() -> None:
             state_manager=state_manager,
         )
         consumer = ConsoleConsumer(event_bus=event_bus)
-        sse_consumer = SSEConsumer(event_bus=event_bus, host="0.0.0.0", port=8085)
-
-        # Run consumer in background, start SSE server, then start the scheduler.
-        consumer_task = asyncio.create_task(consumer.start(), name="console-consumer")
-        await sse_consumer.start()
-        await scheduler.start()
+        sse_consumer = SSEConsumer(
+            event_bus=event_bus,
+            host="0.0.0.0",
+            port=8085,
+            reset_breaker=scheduler.reset_breaker,
+        )
 
-        # Wait until interrupted.
-        stop_event = asyncio.Event()
         loop = asyncio.get_running_loop()
+        stop: asyncio.Future[None] = loop.create_future()
         for sig in (signal.SIGINT, signal.SIGTERM):
-            loop.add_signal_handler(sig, stop_event.set)
-
-        logger.info("Status Page Monitor running — press Ctrl+C to stop")
-        await stop_event.wait()
-
-        # Graceful shutdown.
-        logger.info("Shutting down…")
-        await scheduler.stop()
-        await sse_consumer.stop()
-        await consumer.stop()
-        consumer_task.cancel()
-        try:
-            await consumer_task
-        except asyncio.CancelledError:
-            pass
+            loop.add_signal_handler(
+                sig, lambda: stop.done() or stop.set_result(None)
+            )
+
+        # Background tasks live in a TaskGroup: a crash in one surfaces here
+        # instead of dying silently, and cancelled children need no
+        # try/except CancelledError bookkeeping.
+        async with asyncio.TaskGroup() as tg:
+            # Run consumer in background, start SSE server, then the scheduler.
+            consumer_task = tg.create_task(
+                consumer.start(), name="console-consumer"
+            )
+            scheduler_task: asyncio.Task[None] | None = None
+            snapshot_task: asyncio.Task[None] | None = None
+            # The shutdown below must run however we leave: a signal, a
+            # failed start-up step, or the TaskGroup cancelling this body
+            # because a child crashed.  Otherwise the scheduler keeps polling
+            # and the last state changes never reach the snapshot.
+            try:
+                await sse_consumer.start()
+                # Console + SSE broadcaster: don't publish before both are
+                # listening.
+                await event_bus.wait_for_subscribers(2)
+                # A child of the group, so a crashed dispatcher shuts the
+                # monitor down instead of polling stopping silently.
+                scheduler_task = tg.create_task(
+                    scheduler.run(), name="poll-scheduler"
+                )
+                snapshot_task = tg.create_task(
+                    state_manager.run_snapshots(), name="state-snapshots"
+                )
+
+                logger.info("Status Page Monitor running — press Ctrl+C to stop")
+                await stop
+            finally:
+                # Graceful shutdown.
+                logger.info("Shutting down…")
+                await scheduler.stop()
+                if scheduler_task is not None:
+                    # In case it was stopped before it ever got to run.
+                    scheduler_task.cancel()
+                if snapshot_task is not None:
+                    snapshot_task.cancel()
+                    # Let an in-flight periodic snapshot finish before the
+                    # final one.
+                    await asyncio.wait([snapshot_task])
+                await state_manager.save()
+                state_manager.close()
+                await sse_consumer.stop()
+                await consumer.stop()
+                consumer_task.cancel()
 
     logger.info("Goodbye")
 
 
+def _run() -> None:
+    """Run :func:`main` on uvloop when it is installed, else stock asyncio."""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    _run()
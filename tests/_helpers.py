@@ -0,0 +1,89 @@
+"""Lightweight test doubles and constants shared across the test suite."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any, Union
+
+from aiohttp import web
+
+from core.fetcher import FetchResult
+
+
+# Served by the ``feed_server`` fixture's ``/feed.atom`` route.
+FEED_BODY = "<feed><entry>...</entry></feed>"
+FEED_ETAG = '"xyz"'
+FEED_LAST_MODIFIED = "Sat, 14 Jun 2025 10:00:00 GMT"
+
+REQUESTS = web.AppKey("requests", list)
+PEERS = web.AppKey("peers", set)
+# {"active": n, "peak": n} for /slow.atom — a dict, since a started app's
+# own keys must not be reassigned.
+CONCURRENCY = web.AppKey("concurrency", dict)
+
+# Loop iterations to run after each clock step, enough for a timer to wake
+# the dispatcher and the poll it starts to finish.
+_SETTLE_ITERATIONS = 20
+
+
+class VirtualClock:
+    """Stand-in for an event loop's clock that only moves when told to.
+
+    Installed over ``loop.time`` by the ``virtual_clock`` fixture, so
+    every timer (``asyncio.sleep``, ``wait_for`` timeouts, ``call_later``)
+    is measured against it.  A test steps time forward with
+    :meth:`advance` instead of sleeping for real.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    async def advance(self, seconds: float, step: float = 1.0) -> None:
+        """Move the clock forward *seconds*, firing due timers every *step*.
+
+        Work already due runs first, before the clock moves at all.
+        """
+        target = self.now + seconds
+        await self._settle()
+        while self.now < target:
+            self.now = min(self.now + step, target)
+            await self._settle()
+
+    @staticmethod
+    async def _settle() -> None:
+        for _ in range(_SETTLE_ITERATIONS):
+            await asyncio.sleep(0)
+
+
+class NoJitter(random.Random):
+    """:class:`random.Random` whose :meth:`uniform` always returns 0."""
+
+    def uniform(self, a: float, b: float) -> float:
+        return 0.0
+
+
+class SequencedFetcher:
+    """Stand-in for :class:`FeedFetcher` that replays canned outcomes.
+
+    Each :meth:`fetch` returns (or raises, for exceptions) the next item of
+    *outcomes*; the last one repeats once the list is exhausted.  A plain
+    coroutine method is far cheaper per call than ``AsyncMock``, which
+    matters for tests that poll in a tight loop.
+    """
+
+    def __init__(self, outcomes: list[Union[FetchResult, BaseException]]) -> None:
+        if not outcomes:
+            raise ValueError("outcomes must not be empty")
+        self._outcomes = outcomes
+        self.calls = 0
+
+    async def fetch(self, *args: Any, **kwargs: Any) -> FetchResult:
+        outcome = self._outcomes[min(self.calls, len(self._outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
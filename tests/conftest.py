@@ -2,12 +2,118 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
+from typing import AsyncIterator
 
+import aiohttp
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 
+from core.parser import FeedParser, ParsedEntry
 from events.bus import EventBus
 from events.models import StatusEvent
+from tests._helpers import (
+    CONCURRENCY,
+    FEED_BODY,
+    FEED_ETAG,
+    FEED_LAST_MODIFIED,
+    PEERS,
+    REQUESTS,
+    VirtualClock,
+)
+
+
+def _make_feed_app() -> web.Application:
+    """Build a tiny status-feed server that honours conditional requests.
+
+    Routes
+    ------
+    ``/feed.atom``
+        200 with :data:`FEED_BODY`, 304 when the validators match, 206 for
+        ``Range`` requests.
+    ``/slow.atom``
+        200 after a short delay; tracks peak concurrency in ``app[CONCURRENCY]``.
+    ``/unavailable.atom``
+        Always 503, with an HTML error page and its own validators.
+
+    Request headers of every call are appended to ``app[REQUESTS]``; the
+    client address of each ``/feed.atom`` call is added to ``app[PEERS]``.
+    """
+    app = web.Application()
+    app[REQUESTS] = []
+    app[PEERS] = set()
+    app[CONCURRENCY] = {"active": 0, "peak": 0}
+
+    async def feed(request: web.Request) -> web.Response:
+        app[REQUESTS].append(request.headers)
+        app[PEERS].add(request.transport.get_extra_info("peername"))
+        validators = {"ETag": FEED_ETAG, "Last-Modified": FEED_LAST_MODIFIED}
+        if (
+            request.headers.get("If-None-Match") == FEED_ETAG
+            or request.headers.get("If-Modified-Since") == FEED_LAST_MODIFIED
+        ):
+            return web.Response(status=304, headers=validators)
+        if "Range" in request.headers:
+            end = int(request.headers["Range"].rsplit("-", 1)[1])
+            return web.Response(
+                status=206,
+                text=FEED_BODY[: end + 1],
+                headers={**validators, "Accept-Ranges": "bytes"},
+            )
+        return web.Response(
+            text=FEED_BODY, headers={**validators, "Accept-Ranges": "bytes"}
+        )
+
+    async def slow(request: web.Request) -> web.Response:
+        app[REQUESTS].append(request.headers)
+        concurrency = app[CONCURRENCY]
+        concurrency["active"] += 1
+        concurrency["peak"] = max(concurrency["peak"], concurrency["active"])
+        try:
+            await asyncio.sleep(0.05)
+            return web.Response(text="<feed></feed>")
+        finally:
+            concurrency["active"] -= 1
+
+    async def unavailable(request: web.Request) -> web.Response:
+        app[REQUESTS].append(request.headers)
+        return web.Response(
+            status=503,
+            text="<html><body>Service Unavailable</body></html>",
+            content_type="text/html",
+            headers={"ETag": '"error-page"'},
+        )
+
+    app.router.add_get("/feed.atom", feed)
+    app.router.add_get("/slow.atom", slow)
+    app.router.add_get("/unavailable.atom", unavailable)
+    return app
+
+
+@pytest.fixture
+async def feed_server() -> AsyncIterator[TestServer]:
+    """Run the in-process feed server from :func:`_make_feed_app`."""
+    server = TestServer(_make_feed_app())
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Return a real aiohttp session, closed after the test."""
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+@pytest.fixture
+async def virtual_clock(monkeypatch: pytest.MonkeyPatch) -> VirtualClock:
+    """Drive the running loop's timers from a :class:`VirtualClock`."""
+    clock = VirtualClock()
+    monkeypatch.setattr(asyncio.get_running_loop(), "time", clock.time)
+    return clock
 
 
 @pytest.fixture
@@ -30,7 +136,7 @@ def sample_status_event() -> StatusEvent:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_atom_feed() -> str:
     """Return a realistic Atom XML feed string with 3 entries."""
     return """\
@@ -69,3 +175,12 @@ def sample_atom_feed() -> str:
   </entry>
 </feed>
 """
+
+
+@pytest.fixture(scope="module")
+def parsed_github_entries(sample_atom_feed: str) -> list[ParsedEntry]:
+    """Return :func:`sample_atom_feed` parsed once per module as GitHub.
+
+    Shared across tests — treat the entries as read-only.
+    """
+    return FeedParser().parse(sample_atom_feed, "GitHub")
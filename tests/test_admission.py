@@ -0,0 +1,64 @@
+"""Tests for core.admission.AdmissionController."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from core.admission import AdmissionController
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency() -> None:
+    """No more than *limit* callers should be inside at once."""
+    controller = AdmissionController(2)
+    peak = 0
+
+    async def worker() -> None:
+        nonlocal peak
+        async with controller:
+            peak = max(peak, controller.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(worker() for _ in range(6)))
+
+    assert peak == 2
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_raising_limit_admits_waiters() -> None:
+    """set_limit() should immediately admit callers that now fit."""
+    controller = AdmissionController(1)
+    await controller.acquire()
+    assert controller.locked()
+
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await controller.set_limit(2)
+    await asyncio.wait_for(waiter, timeout=1.0)
+    assert controller.active == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot() -> None:
+    """Cancelling a waiter must leave the slot available to others."""
+    controller = AdmissionController(1)
+    await controller.acquire()
+
+    cancelled = asyncio.create_task(controller.acquire())
+    other = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+
+    cancelled.cancel()
+    await controller.release()
+    await asyncio.wait_for(other, timeout=1.0)
+    assert controller.active == 1
+
+
+def test_rejects_non_positive_limit() -> None:
+    with pytest.raises(ValueError):
+        AdmissionController(0)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+from contextlib import aclosing
 from datetime import datetime, timezone
 
 import pytest
@@ -35,8 +36,7 @@ async def test_publish_subscribe(event_bus: EventBus) -> None:
             break  # stop after first event
 
     consumer_task = asyncio.create_task(consume())
-    # Small delay to let the subscriber register.
-    await asyncio.sleep(0.05)
+    await event_bus.wait_for_subscribers(1)
     await event_bus.publish(event)
     await asyncio.wait_for(consumer_task, timeout=2.0)
 
@@ -58,7 +58,7 @@ async def test_fan_out_multiple_subscribers(event_bus: EventBus) -> None:
 
     task_a = asyncio.create_task(consume(received_a))
     task_b = asyncio.create_task(consume(received_b))
-    await asyncio.sleep(0.05)
+    await event_bus.wait_for_subscribers(2)
 
     await event_bus.publish(event)
     await asyncio.wait_for(asyncio.gather(task_a, task_b), timeout=2.0)
@@ -87,15 +87,14 @@ async def test_subscriber_cleanup_after_close(event_bus: EventBus) -> None:
         await gen.aclose()
 
     task = asyncio.create_task(consume())
-    await asyncio.sleep(0.05)
+    await event_bus.wait_for_subscribers(1)
     assert event_bus.size() == 1
 
     # Publish an event so the consumer can break out.
     await event_bus.publish(_make_event())
     await asyncio.wait_for(task, timeout=2.0)
 
-    # After the generator closes, give a moment for cleanup.
-    await asyncio.sleep(0.05)
+    # aclose() ran the generator's finally block before the task finished.
     assert event_bus.size() == 0
 
 
@@ -107,20 +106,113 @@ async def test_size_reflects_active_subscribers(event_bus: EventBus) -> None:
     events_received: list[list[StatusEvent]] = [[], []]
 
     async def consume(dest: list[StatusEvent]) -> None:
-        async for e in event_bus.subscribe():
-            dest.append(e)
-            break
+        async with aclosing(event_bus.subscribe()) as events:
+            async for e in events:
+                dest.append(e)
+                break
 
     task1 = asyncio.create_task(consume(events_received[0]))
-    await asyncio.sleep(0.05)
+    await event_bus.wait_for_subscribers(1)
     assert event_bus.size() == 1
 
     task2 = asyncio.create_task(consume(events_received[1]))
-    await asyncio.sleep(0.05)
+    await event_bus.wait_for_subscribers(2)
     assert event_bus.size() == 2
 
     # Publish to let both consumers finish.
     await event_bus.publish(_make_event())
     await asyncio.wait_for(asyncio.gather(task1, task2), timeout=2.0)
-    await asyncio.sleep(0.05)
     assert event_bus.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest_event() -> None:
+    """A stalled subscriber keeps only the newest *capacity* events."""
+    bus = EventBus(capacity=2)
+    events = [_make_event(provider=f"P{i}") for i in range(5)]
+    gate = asyncio.Event()
+    received: list[StatusEvent] = []
+
+    async def consume() -> None:
+        async for e in bus.subscribe():
+            received.append(e)
+            if len(received) == 1:
+                await gate.wait()
+            if len(received) == 3:
+                break
+
+    task = asyncio.create_task(consume())
+    await bus.wait_for_subscribers(1)
+    await bus.publish(events[0])
+    # Let the subscriber take P0 and stall on the gate.
+    await asyncio.sleep(0)
+
+    # Subscriber is now stalled on the gate; publishing must not block.
+    for event in events[1:]:
+        await asyncio.wait_for(bus.publish(event), timeout=1.0)
+
+    gate.set()
+    await asyncio.wait_for(task, timeout=2.0)
+
+    assert [e.provider for e in received] == ["P0", "P3", "P4"]
+
+
+@pytest.mark.asyncio
+async def test_stalled_subscriber_backlog_is_bounded() -> None:
+    """A subscriber that never reads holds at most *capacity* events."""
+    bus = EventBus(capacity=1024)
+    stream = bus.subscribe()
+    pending = asyncio.ensure_future(stream.__anext__())
+    await bus.wait_for_subscribers(1)
+
+    for i in range(2000):
+        await bus.publish(_make_event(provider=f"P{i}"))
+
+    (queue,) = bus._subscriber_queues.values()
+    assert queue.qsize() == 1024
+    # The reader never ran, so only the newest 1024 events survive.
+    assert (await pending).provider == "P976"
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_batches_groups_a_burst(event_bus: EventBus) -> None:
+    """Events published back-to-back should arrive as a single batch."""
+    batches: list[list[StatusEvent]] = []
+
+    async def consume() -> None:
+        async with aclosing(event_bus.subscribe_batches(window=0.01)) as stream:
+            async for batch in stream:
+                batches.append(batch)
+                break
+
+    task = asyncio.create_task(consume())
+    await event_bus.wait_for_subscribers(1)
+    for i in range(3):
+        await event_bus.publish(_make_event(provider=f"P{i}"))
+    await asyncio.wait_for(task, timeout=2.0)
+
+    assert [[e.provider for e in b] for b in batches] == [["P0", "P1", "P2"]]
+    assert event_bus.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_subscribers_blocks_until_registered(
+    event_bus: EventBus,
+) -> None:
+    """wait_for_subscribers() returns only once enough queues exist."""
+    waiter = asyncio.create_task(event_bus.wait_for_subscribers(2))
+    first = event_bus.subscribe()
+    second = event_bus.subscribe()
+
+    pending = asyncio.ensure_future(first.__anext__())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    pending_second = asyncio.ensure_future(second.__anext__())
+    await asyncio.wait_for(waiter, timeout=1.0)
+    assert event_bus.size() == 2
+
+    for task in (pending, pending_second):
+        task.cancel()
+    await asyncio.gather(pending, pending_second, return_exceptions=True)
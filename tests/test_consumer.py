@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import sys
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 import pytest
 
@@ -45,6 +49,12 @@ class TestConsoleConsumerFormatEvent:
         assert "[NEW]" not in output
         assert "Provider: GitHub" in output
 
+    def test_format_circuit_open_event(self) -> None:
+        output = ConsoleConsumer._format_event(_make_event(event_type="circuit_open"))
+
+        assert "[CIRCUIT OPEN]" in output
+        assert "[NEW]" not in output
+
     def test_format_event_with_empty_message(self) -> None:
         event = StatusEvent(
             provider="AWS",
@@ -71,3 +81,30 @@ class TestConsumerABCCannotBeInstantiated:
     def test_cannot_instantiate_consumer_abc(self) -> None:
         with pytest.raises(TypeError):
             Consumer()  # type: ignore[abstract]
+
+
+class TestConsoleConsumerStart:
+    """start() should write a burst of events to stdout in one go."""
+
+    async def test_burst_is_written_once(self, event_bus) -> None:
+        consumer = ConsoleConsumer(event_bus=event_bus)
+        written = asyncio.Event()
+        with patch.object(
+            sys.stdout, "write", side_effect=lambda _: written.set()
+        ) as write:
+            task = asyncio.create_task(consumer.start())
+            await event_bus.wait_for_subscribers(1)
+
+            await event_bus.publish(_make_event("new"))
+            await event_bus.publish(_make_event("updated"))
+            await asyncio.wait_for(written.wait(), timeout=1.0)
+
+            await consumer.stop()
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        write.assert_called_once()
+        out = write.call_args.args[0]
+        assert out.count("-" * 40) == 2
+        assert out.index("[NEW]") < out.index("[UPDATED]")
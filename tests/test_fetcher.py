@@ -1,160 +1,288 @@
-"""Tests for core.fetcher.FeedFetcher."""
+"""Tests for core.fetcher.FeedFetcher.
+
+Requests go through a real ``aiohttp`` client to the in-process feed
+server from ``conftest.feed_server``, so headers are checked on the wire.
+"""
 
 from __future__ import annotations
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+import dataclasses
 
+import aiohttp
 import pytest
+from aiohttp.test_utils import TestServer
 
+from core.admission import AdmissionController
 from core.fetcher import FeedFetcher, FetchResult
+from tests._helpers import (
+    CONCURRENCY,
+    FEED_BODY,
+    FEED_ETAG,
+    FEED_LAST_MODIFIED,
+    PEERS,
+    REQUESTS,
+)
 
 
-def _make_mock_response(
-    status: int = 200,
-    text: str = "<feed></feed>",
-    headers: dict[str, str] | None = None,
-) -> MagicMock:
-    """Create a mock aiohttp response with async context manager support."""
-    resp = MagicMock()
-    resp.status = status
-    resp.text = AsyncMock(return_value=text)
-    resp.headers = headers or {}
-    return resp
-
-
-def _make_mock_session(response: MagicMock) -> MagicMock:
-    """Create a mock aiohttp.ClientSession whose .get() returns *response*."""
-    ctx = MagicMock()
-    ctx.__aenter__ = AsyncMock(return_value=response)
-    ctx.__aexit__ = AsyncMock(return_value=False)
-
-    session = MagicMock()
-    session.get = MagicMock(return_value=ctx)
-    return session
+def _make_fetcher(
+    session: aiohttp.ClientSession, concurrency: int = 5
+) -> FeedFetcher:
+    return FeedFetcher(semaphore=asyncio.Semaphore(concurrency), session=session)
 
 
 @pytest.mark.asyncio
-async def test_fetch_200_returns_content_and_headers() -> None:
+async def test_fetch_200_returns_content_and_headers(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
     """A 200 response should return body content and caching headers."""
-    response = _make_mock_response(
-        status=200,
-        text="<feed><entry>...</entry></feed>",
-        headers={"ETag": '"xyz"', "Last-Modified": "Sat, 14 Jun 2025 10:00:00 GMT"},
-    )
-    session = _make_mock_session(response)
-    semaphore = asyncio.Semaphore(5)
-    fetcher = FeedFetcher(semaphore=semaphore, session=session)
+    fetcher = _make_fetcher(http_session)
 
-    result = await fetcher.fetch("https://example.com/feed.atom")
+    result = await fetcher.fetch(str(feed_server.make_url("/feed.atom")))
 
     assert isinstance(result, FetchResult)
     assert result.status_code == 200
-    assert result.content == "<feed><entry>...</entry></feed>"
-    assert result.etag == '"xyz"'
-    assert result.last_modified == "Sat, 14 Jun 2025 10:00:00 GMT"
+    assert result.content == FEED_BODY.encode()
+    assert result.etag == FEED_ETAG
+    assert result.last_modified == FEED_LAST_MODIFIED
 
 
 @pytest.mark.asyncio
-async def test_fetch_304_returns_none_content() -> None:
+async def test_fetch_304_returns_none_content(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
     """A 304 Not Modified response should return content=None."""
-    response = _make_mock_response(status=304)
-    session = _make_mock_session(response)
-    semaphore = asyncio.Semaphore(5)
-    fetcher = FeedFetcher(semaphore=semaphore, session=session)
+    fetcher = _make_fetcher(http_session)
 
     result = await fetcher.fetch(
-        "https://example.com/feed.atom",
-        etag='"old-etag"',
+        str(feed_server.make_url("/feed.atom")),
+        etag=FEED_ETAG,
         last_modified="old-date",
     )
 
     assert result.status_code == 304
     assert result.content is None
     # On 304, the original etag/last_modified are preserved.
-    assert result.etag == '"old-etag"'
+    assert result.etag == FEED_ETAG
     assert result.last_modified == "old-date"
 
 
 @pytest.mark.asyncio
-async def test_conditional_headers_sent_when_provided() -> None:
+async def test_fetch_error_status_raises(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """A 4xx/5xx response is a failed fetch, not a feed to parse."""
+    fetcher = _make_fetcher(http_session)
+
+    with pytest.raises(aiohttp.ClientResponseError) as excinfo:
+        await fetcher.fetch(str(feed_server.make_url("/unavailable.atom")))
+
+    assert excinfo.value.status == 503
+
+
+@pytest.mark.asyncio
+async def test_conditional_headers_sent_when_provided(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
     """When etag and last_modified are given, conditional headers must be sent."""
-    response = _make_mock_response(status=200)
-    session = _make_mock_session(response)
-    semaphore = asyncio.Semaphore(5)
-    fetcher = FeedFetcher(semaphore=semaphore, session=session)
+    fetcher = _make_fetcher(http_session)
 
     await fetcher.fetch(
-        "https://example.com/feed.atom",
+        str(feed_server.make_url("/feed.atom")),
         etag='"my-etag"',
-        last_modified="Sat, 14 Jun 2025 10:00:00 GMT",
+        last_modified="Sat, 14 Jun 2025 09:00:00 GMT",
     )
 
-    # Inspect the headers passed to session.get().
-    call_kwargs = session.get.call_args
-    headers = call_kwargs.kwargs.get("headers") or call_kwargs[1].get("headers")
+    headers = feed_server.app[REQUESTS][-1]
     assert headers["If-None-Match"] == '"my-etag"'
-    assert headers["If-Modified-Since"] == "Sat, 14 Jun 2025 10:00:00 GMT"
+    assert headers["If-Modified-Since"] == "Sat, 14 Jun 2025 09:00:00 GMT"
 
 
 @pytest.mark.asyncio
-async def test_no_conditional_headers_when_none() -> None:
+async def test_no_conditional_headers_when_none(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
     """When no etag/last_modified are provided, no conditional headers are sent."""
-    response = _make_mock_response(status=200)
-    session = _make_mock_session(response)
-    semaphore = asyncio.Semaphore(5)
-    fetcher = FeedFetcher(semaphore=semaphore, session=session)
+    fetcher = _make_fetcher(http_session)
 
-    await fetcher.fetch("https://example.com/feed.atom")
+    await fetcher.fetch(str(feed_server.make_url("/feed.atom")))
 
-    call_kwargs = session.get.call_args
-    headers = call_kwargs.kwargs.get("headers") or call_kwargs[1].get("headers")
+    headers = feed_server.app[REQUESTS][-1]
     assert "If-None-Match" not in headers
     assert "If-Modified-Since" not in headers
 
 
 @pytest.mark.asyncio
-async def test_semaphore_is_acquired_and_released() -> None:
+async def test_semaphore_is_acquired_and_released(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
     """The semaphore should be acquired before the request and released after."""
-    response = _make_mock_response(status=200)
-    session = _make_mock_session(response)
     semaphore = asyncio.Semaphore(1)
-    fetcher = FeedFetcher(semaphore=semaphore, session=session)
+    fetcher = FeedFetcher(semaphore=semaphore, session=http_session)
 
     # Semaphore starts at 1 (available).
     assert not semaphore.locked()
 
-    await fetcher.fetch("https://example.com/feed.atom")
+    await fetcher.fetch(str(feed_server.make_url("/feed.atom")))
 
     # After fetch completes, semaphore should be released again.
     assert not semaphore.locked()
 
 
 @pytest.mark.asyncio
-async def test_semaphore_limits_concurrency() -> None:
-    """Only one fetch should proceed at a time with semaphore=1."""
-    call_order: list[str] = []
+async def test_semaphore_limits_concurrency(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """Only one fetch should reach the server at a time with semaphore=1."""
+    fetcher = _make_fetcher(http_session, concurrency=1)
+    slow = feed_server.make_url("/slow.atom")
+
+    await asyncio.gather(
+        fetcher.fetch(str(slow.with_query(p="a"))),
+        fetcher.fetch(str(slow.with_query(p="b"))),
+    )
 
-    async def slow_text() -> str:
-        call_order.append("reading")
-        await asyncio.sleep(0.1)
-        return "<feed></feed>"
+    assert len(feed_server.app[REQUESTS]) == 2
+    assert feed_server.app[CONCURRENCY]["peak"] == 1
 
-    response = MagicMock()
-    response.status = 200
-    response.text = slow_text
-    response.headers = {}
 
-    session = _make_mock_session(response)
-    semaphore = asyncio.Semaphore(1)
-    fetcher = FeedFetcher(semaphore=semaphore, session=session)
+@pytest.mark.asyncio
+async def test_accept_encoding_requests_compression(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """Every request should advertise compressed transfer encodings."""
+    fetcher = _make_fetcher(http_session)
+
+    await fetcher.fetch(str(feed_server.make_url("/feed.atom")))
+
+    assert "gzip" in feed_server.app[REQUESTS][-1]["Accept-Encoding"]
+
+
+@pytest.mark.asyncio
+async def test_byte_range_requests_uncompressed_head(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """A ranged fetch asks for the feed head without compression."""
+    fetcher = _make_fetcher(http_session)
+
+    result = await fetcher.fetch(
+        str(feed_server.make_url("/feed.atom")), byte_range=6
+    )
+
+    headers = feed_server.app[REQUESTS][-1]
+    assert headers["Range"] == "bytes=0-5"
+    assert headers["Accept-Encoding"] == "identity"
+    assert result.status_code == 206
+    assert result.content == FEED_BODY[:6].encode()
+    assert result.accept_ranges == "bytes"
+
+
+@pytest.mark.asyncio
+async def test_providers_share_one_pooled_connection(
+    feed_server: TestServer,
+) -> None:
+    """Sequential polls for several providers reuse one keep-alive socket."""
+    connector = aiohttp.TCPConnector(limit_per_host=4, keepalive_timeout=75)
+    async with FeedFetcher(
+        semaphore=asyncio.Semaphore(5),
+        session=aiohttp.ClientSession(connector=connector),
+    ) as fetcher:
+        for provider in ("openai", "github", "aws"):
+            url = feed_server.make_url("/feed.atom").with_query(p=provider)
+            await fetcher.fetch(str(url))
+
+    assert len(feed_server.app[REQUESTS]) == 3
+    assert len(feed_server.app[PEERS]) == 1
+    assert connector.closed
 
-    # Launch two fetches concurrently.
-    task1 = asyncio.create_task(fetcher.fetch("https://example.com/feed1.atom"))
-    task2 = asyncio.create_task(fetcher.fetch("https://example.com/feed2.atom"))
 
-    await asyncio.gather(task1, task2)
+@pytest.mark.asyncio
+async def test_concurrent_identical_fetches_share_one_request(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """Two providers polling one URL at once cause a single request."""
+    fetcher = _make_fetcher(http_session)
+    url = str(feed_server.make_url("/slow.atom"))
+
+    first, second = await asyncio.gather(fetcher.fetch(url), fetcher.fetch(url))
+
+    assert len(feed_server.app[REQUESTS]) == 1
+    assert first is second
+    assert fetcher._in_flight == {}
+    # The shared result is frozen, so no provider can alter another's copy.
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.etag = '"mine"'  # type: ignore[misc]
+
+
+async def _wait_until_server_busy(server: TestServer) -> None:
+    while not server.app[CONCURRENCY]["active"]:
+        await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_last_caller_cancels_request(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """No request outlives its callers, nor keeps their admission slot."""
+    admission = AdmissionController(1)
+    fetcher = FeedFetcher(semaphore=admission, session=http_session)
+    caller = asyncio.create_task(
+        fetcher.fetch(str(feed_server.make_url("/slow.atom")))
+    )
+    await _wait_until_server_busy(feed_server)
+
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    assert fetcher._in_flight == {}
+    assert admission.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_keeps_request_for_others(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    fetcher = _make_fetcher(http_session)
+    url = str(feed_server.make_url("/slow.atom"))
+    cancelled = asyncio.create_task(fetcher.fetch(url))
+    survivor = asyncio.create_task(fetcher.fetch(url))
+    await _wait_until_server_busy(feed_server)
+
+    cancelled.cancel()
+    result = await survivor
+
+    assert cancelled.cancelled()
+    assert result.status_code == 200
+    assert len(feed_server.app[REQUESTS]) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_in_flight_requests(feed_server: TestServer) -> None:
+    """close() stops pending requests before closing the session under them."""
+    admission = AdmissionController(1)
+    fetcher = FeedFetcher(semaphore=admission, session=aiohttp.ClientSession())
+    caller = asyncio.create_task(
+        fetcher.fetch(str(feed_server.make_url("/slow.atom")))
+    )
+    await _wait_until_server_busy(feed_server)
+
+    await fetcher.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    assert fetcher._in_flight == {}
+    assert admission.active == 0
+
+
+@pytest.mark.asyncio
+async def test_different_validators_are_not_coalesced(
+    feed_server: TestServer, http_session: aiohttp.ClientSession
+) -> None:
+    """Requests with different conditional headers each go to the server."""
+    fetcher = _make_fetcher(http_session)
+    url = str(feed_server.make_url("/slow.atom"))
+
+    await asyncio.gather(fetcher.fetch(url), fetcher.fetch(url, etag='"v1"'))
 
-    # Both should complete.
-    assert task1.done()
-    assert task2.done()
+    assert len(feed_server.app[REQUESTS]) == 2
@@ -7,7 +7,7 @@ that the ConsoleConsumer receives and correctly formats the resulting events.
 from __future__ import annotations
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -19,7 +19,7 @@ from core.state import StateManager
 from events.bus import EventBus
 
 
-SAMPLE_FEED = """\
+SAMPLE_FEED = b"""\
 <?xml version="1.0" encoding="UTF-8"?>
 <feed xmlns="http://www.w3.org/2005/Atom">
   <title>TestProvider Status</title>
@@ -44,28 +44,16 @@ async def test_end_to_end_pipeline() -> None:
     event_bus = EventBus()
     state_manager = StateManager()
 
-    # Mock fetcher that returns our sample feed once, then 304s.
+    # Mock fetcher that serves our sample feed.
     fetcher = MagicMock(spec=FeedFetcher)
-    call_count = 0
-
-    async def mock_fetch(*args, **kwargs) -> FetchResult:
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            return FetchResult(
-                status_code=200,
-                content=SAMPLE_FEED,
-                etag='"test-etag"',
-                last_modified="Sun, 15 Jun 2025 12:00:00 GMT",
-            )
-        return FetchResult(
-            status_code=304,
-            content=None,
+    fetcher.fetch = AsyncMock(
+        return_value=FetchResult(
+            status_code=200,
+            content=SAMPLE_FEED,
             etag='"test-etag"',
             last_modified="Sun, 15 Jun 2025 12:00:00 GMT",
         )
-
-    fetcher.fetch = AsyncMock(side_effect=mock_fetch)
+    )
 
     provider_cfg = {
         "name": "IntegrationTest",
@@ -93,8 +81,7 @@ async def test_end_to_end_pipeline() -> None:
 
     collector_task = asyncio.create_task(collect_events())
 
-    # Give the subscriber time to register.
-    await asyncio.sleep(0.05)
+    await event_bus.wait_for_subscribers(1)
 
     # -- Also test ConsoleConsumer formatting via captured print --
     printed_lines: list[str] = []
@@ -111,28 +98,17 @@ async def test_end_to_end_pipeline() -> None:
                 break
 
     consumer_task = asyncio.create_task(consumer_task_fn())
-    await asyncio.sleep(0.05)
-
-    # -- Run the scheduler for one poll cycle --
-    # Patch asyncio.sleep so the poll loop doesn't actually wait.
-    poll_count = 0
-
-    async def fast_sleep(delay: float) -> None:
-        nonlocal poll_count
-        poll_count += 1
-        if poll_count >= 2:
-            raise asyncio.CancelledError()
-
-    with patch("core.scheduler.asyncio.sleep", side_effect=fast_sleep):
-        await scheduler.start()
-        try:
-            await asyncio.gather(*scheduler._tasks, return_exceptions=True)
-        except asyncio.CancelledError:
-            pass
-
-    # -- Wait for events to be collected --
-    await asyncio.wait_for(collector_task, timeout=5.0)
-    await asyncio.wait_for(consumer_task, timeout=5.0)
+    await event_bus.wait_for_subscribers(2)
+
+    # -- Run the scheduler until the first poll has been published --
+    # The first poll happens immediately on start(); the next one is a full
+    # poll interval away, so the test never has to touch the clock.
+    await scheduler.start()
+    try:
+        await asyncio.wait_for(collector_task, timeout=5.0)
+        await asyncio.wait_for(consumer_task, timeout=5.0)
+    finally:
+        await scheduler.stop()
 
     # -- Assertions --
     # 1. One event per entry; product = provider name.
@@ -155,3 +131,6 @@ async def test_end_to_end_pipeline() -> None:
     state = state_manager.get_state("IntegrationTest")
     assert "incident-integration-001" in state.seen_entries
     assert state.etag == '"test-etag"'
+
+    # 4. Exactly one poll ran; the next was still a poll interval away.
+    assert fetcher.fetch.await_count == 1
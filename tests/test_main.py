@@ -0,0 +1,105 @@
+"""Tests for provider loading and shutdown in main."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import main
+from consumers.console import ConsoleConsumer
+from consumers.sse import SSEConsumer
+from core.scheduler import PollScheduler
+from core.state import StateManager
+from events.bus import EventBus
+
+_PROVIDERS_YAML = """\
+providers:
+  - name: "OpenAI"
+    feed_url: "https://status.openai.com/feed.atom"
+    poll_interval_seconds: 30
+"""
+
+
+def _write_config(path: Path, text: str = _PROVIDERS_YAML) -> Path:
+    path.write_text(text)
+    return path
+
+
+class TestLoadProviders:
+    """Verify YAML parsing and the mtime/size-validated cache."""
+
+    def test_loads_provider_list(self, tmp_path: Path) -> None:
+        providers = main._load_providers(_write_config(tmp_path / "p.yaml"))
+        assert providers == [
+            {
+                "name": "OpenAI",
+                "feed_url": "https://status.openai.com/feed.atom",
+                "poll_interval_seconds": 30,
+            }
+        ]
+
+    def test_unchanged_file_is_not_reparsed(self, tmp_path: Path) -> None:
+        path = _write_config(tmp_path / "p.yaml")
+        first = main._load_providers(path)
+        with patch("yaml.load") as yaml_load:
+            second = main._load_providers(path)
+        yaml_load.assert_not_called()
+        assert second == first
+        assert second is not first
+
+    def test_changed_file_is_reparsed(self, tmp_path: Path) -> None:
+        path = _write_config(tmp_path / "p.yaml")
+        main._load_providers(path)
+        _write_config(path, _PROVIDERS_YAML.replace("30", "45"))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        providers = main._load_providers(path)
+        assert providers[0]["poll_interval_seconds"] == 45
+
+    def test_empty_file_has_no_providers(self, tmp_path: Path) -> None:
+        assert main._load_providers(_write_config(tmp_path / "p.yaml", "")) == []
+
+
+async def test_crashed_child_still_runs_graceful_shutdown(tmp_path: Path) -> None:
+    config = _write_config(tmp_path / "p.yaml")
+    crash = AsyncMock(side_effect=RuntimeError("console crashed"))
+    with (
+        patch.object(main, "_CONFIG_PATH", config),
+        patch.object(main, "_STATE_PATH", tmp_path / "state.mpk"),
+        patch.object(ConsoleConsumer, "start", crash),
+        patch.object(SSEConsumer, "start", AsyncMock()),
+        patch.object(SSEConsumer, "stop", AsyncMock()) as sse_stop,
+        patch.object(PollScheduler, "stop", AsyncMock()) as scheduler_stop,
+        patch.object(StateManager, "save", AsyncMock()) as save,
+    ):
+        with pytest.raises(ExceptionGroup) as excinfo:
+            await main.main()
+
+    assert excinfo.group_contains(RuntimeError, match="console crashed")
+    scheduler_stop.assert_awaited_once()
+    save.assert_awaited_once()
+    sse_stop.assert_awaited_once()
+
+
+async def test_crashed_scheduler_shuts_the_monitor_down(tmp_path: Path) -> None:
+    config = _write_config(tmp_path / "p.yaml")
+    crash = AsyncMock(side_effect=RuntimeError("dispatcher crashed"))
+    with (
+        patch.object(main, "_CONFIG_PATH", config),
+        patch.object(main, "_STATE_PATH", tmp_path / "state.mpk"),
+        patch.object(SSEConsumer, "start", AsyncMock()),
+        patch.object(SSEConsumer, "stop", AsyncMock()),
+        patch.object(EventBus, "wait_for_subscribers", AsyncMock()),
+        patch.object(PollScheduler, "run", crash),
+        patch.object(StateManager, "save", AsyncMock()) as save,
+    ):
+        with pytest.raises(ExceptionGroup) as excinfo:
+            async with asyncio.timeout(5.0):
+                await main.main()
+
+    assert excinfo.group_contains(RuntimeError, match="dispatcher crashed")
+    save.assert_awaited_once()
@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 
 import pytest
 
-from events.models import StatusEvent
+from events.models import StatusEvent, _format_timestamp
 
 
 class TestStatusEventCreation:
@@ -85,3 +85,39 @@ class TestStrDelegatesToFormattedOutput:
 
     def test_str_equals_formatted_output(self, sample_status_event: StatusEvent) -> None:
         assert str(sample_status_event) == sample_status_event.formatted_output()
+
+
+class TestSlots:
+    """StatusEvent uses __slots__ instead of a per-instance __dict__."""
+
+    def test_has_no_instance_dict(self, sample_status_event: StatusEvent) -> None:
+        assert not hasattr(sample_status_event, "__dict__")
+
+
+class TestFormatTimestamp:
+    """_format_timestamp must match the strftime layout it replaces."""
+
+    @pytest.mark.parametrize(
+        "ts",
+        [
+            datetime(2025, 6, 15, 10, 30, 0, tzinfo=timezone.utc),
+            datetime(2025, 1, 2, 3, 4, 5, 999_999, tzinfo=timezone.utc),
+            datetime(2025, 12, 31, 23, 59, 59),
+        ],
+    )
+    def test_matches_strftime(self, ts: datetime) -> None:
+        assert _format_timestamp(ts) == ts.strftime("%Y-%m-%d %H:%M:%S")
+
+    def test_cached_on_the_event(self) -> None:
+        ts = datetime(2025, 6, 15, 10, 30, 0, tzinfo=timezone.utc)
+        event = StatusEvent(
+            provider="GitHub",
+            product="Actions",
+            status="Resolved",
+            message="",
+            timestamp=ts,
+            incident_id="inc-001",
+            event_type="new",
+        )
+        assert event._ts_str == "2025-06-15 10:30:00"
+        assert "_ts_str" not in repr(event)
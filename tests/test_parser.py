@@ -2,30 +2,33 @@
 
 from __future__ import annotations
 
-from core.parser import FeedParser, ParsedEntry
+from core.parser import FeedParser, ParsedEntry, _strip_html
 
 
 class TestParseValidAtom:
     """Verify parsing of well-formed Atom XML."""
 
-    def test_extracts_entries_correctly(self, sample_atom_feed: str) -> None:
-        parser = FeedParser()
-        entries = parser.parse(sample_atom_feed, "GitHub")
+    def test_extracts_entries_correctly(
+        self, parsed_github_entries: list[ParsedEntry]
+    ) -> None:
+        entries = parsed_github_entries
         assert len(entries) == 3
         assert all(isinstance(e, ParsedEntry) for e in entries)
 
-    def test_entry_fields_populated(self, sample_atom_feed: str) -> None:
-        parser = FeedParser()
-        entries = parser.parse(sample_atom_feed, "GitHub")
+    def test_entry_fields_populated(
+        self, parsed_github_entries: list[ParsedEntry]
+    ) -> None:
+        entries = parsed_github_entries
         first = entries[0]
         assert first.entry_id == "incident-001"
         assert first.title == "Degraded performance for Actions"
         assert "2025-06-15" in first.updated
         assert first.summary  # non-empty
 
-    def test_entry_ids_are_correct(self, sample_atom_feed: str) -> None:
-        parser = FeedParser()
-        entries = parser.parse(sample_atom_feed, "GitHub")
+    def test_entry_ids_are_correct(
+        self, parsed_github_entries: list[ParsedEntry]
+    ) -> None:
+        entries = parsed_github_entries
         ids = [e.entry_id for e in entries]
         assert ids == ["incident-001", "incident-002", "incident-003"]
 
@@ -98,3 +101,53 @@ class TestMalformedXml:
         entries = parser.parse("This is just plain text, not XML at all.", "Test")
         assert isinstance(entries, list)
         assert len(entries) == 0
+
+
+class TestFastPathMatchesFeedparser:
+    """The lxml fast path must agree with the feedparser fallback."""
+
+    def test_fast_path_matches_fallback(self, sample_atom_feed: str) -> None:
+        fast = FeedParser._parse_atom_fast(sample_atom_feed, "GitHub")
+        slow = FeedParser._parse_with_feedparser(sample_atom_feed, "GitHub")
+        assert fast is not None
+        assert [e.entry_id for e in fast] == [e.entry_id for e in slow]
+        assert [e.title for e in fast] == [e.title for e in slow]
+        assert [e.summary for e in fast] == [e.summary for e in slow]
+
+    def test_bytes_and_str_parse_alike(
+        self, sample_atom_feed: str, parsed_github_entries: list[ParsedEntry]
+    ) -> None:
+        raw = sample_atom_feed.encode("utf-8")
+        assert FeedParser().parse(raw, "GitHub") == parsed_github_entries
+
+    def test_rss_falls_back_to_feedparser(self) -> None:
+        rss_xml = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <item>
+      <guid>rss-001</guid>
+      <title>RSS incident</title>
+      <description>Investigating</description>
+    </item>
+  </channel>
+</rss>
+"""
+        parser = FeedParser()
+        assert FeedParser._parse_atom_fast(rss_xml, "Test") is None
+        entries = parser.parse(rss_xml, "Test")
+        assert [e.entry_id for e in entries] == ["rss-001"]
+
+
+class TestStripHtml:
+    """Direct checks of the _strip_html helper."""
+
+    def test_plain_text_is_returned_stripped(self) -> None:
+        assert _strip_html("  All systems operational \n") == "All systems operational"
+
+    def test_decodes_entities_without_tags(self) -> None:
+        assert _strip_html("Pages &amp; Actions") == "Pages & Actions"
+
+    def test_strips_tags_with_attributes_in_one_pass(self) -> None:
+        raw = "<small>Jun <var data-var='date'>15</var></small><br><b>Resolved</b>"
+        assert _strip_html(raw) == "Jun 15Resolved"
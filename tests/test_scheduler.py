@@ -3,19 +3,31 @@
 from __future__ import annotations
 
 import asyncio
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
 import pytest
-
-from core.fetcher import FetchResult
-from core.scheduler import PollScheduler, _STAGGER_DELAY
-from core.state import StateManager
+from aiohttp.test_utils import TestServer
+
+from core.fetcher import FeedFetcher, FetchResult
+from core.scheduler import (
+    PollScheduler,
+    _FEED_HEAD_BYTES,
+    _RANGE_MIN_FEED_BYTES,
+    _STAGGER_DELAY,
+)
+from core.state import StateManager, parse_timestamp_ns
 from events.bus import EventBus
+from tests._helpers import NoJitter, SequencedFetcher
 
 
 def _make_fetch_result(
     status_code: int = 200,
-    content: str | None = "<feed></feed>",
+    content: bytes | None = b"<feed></feed>",
     etag: str | None = None,
     last_modified: str | None = None,
 ) -> FetchResult:
@@ -27,17 +39,24 @@ def _make_fetch_result(
     )
 
 
-def _make_provider(name: str = "TestProvider", interval: int = 30) -> dict:
-    return {
+def _make_provider(
+    name: str = "TestProvider",
+    interval: int = 30,
+    max_backoff_seconds: float | None = None,
+) -> dict:
+    provider = {
         "name": name,
         "feed_url": f"https://status.example.com/{name}/feed.atom",
         "poll_interval_seconds": interval,
     }
+    if max_backoff_seconds is not None:
+        provider["max_backoff_seconds"] = max_backoff_seconds
+    return provider
 
 
 @pytest.mark.asyncio
 async def test_start_creates_tasks() -> None:
-    """start() should create one task per provider."""
+    """start() should run one dispatcher task with every provider queued."""
     event_bus = EventBus()
     state_manager = StateManager()
     fetcher = MagicMock()
@@ -52,14 +71,15 @@ async def test_start_creates_tasks() -> None:
     )
 
     await scheduler.start()
-    assert len(scheduler._tasks) == 2
+    assert scheduler._task is not None
+    assert len(scheduler._heap) == 2
     # Cleanup
     await scheduler.stop()
 
 
 @pytest.mark.asyncio
 async def test_stop_cancels_all_tasks() -> None:
-    """stop() should cancel and clear all tasks."""
+    """stop() should cancel the dispatcher and clear the heap."""
     event_bus = EventBus()
     state_manager = StateManager()
     fetcher = MagicMock()
@@ -73,78 +93,291 @@ async def test_stop_cancels_all_tasks() -> None:
     )
 
     await scheduler.start()
-    assert len(scheduler._tasks) == 1
+    task = scheduler._task
+    assert task is not None
 
     await scheduler.stop()
-    assert len(scheduler._tasks) == 0
+    assert task.cancelled()
+    assert scheduler._task is None
+    assert scheduler._heap == []
 
 
 @pytest.mark.asyncio
-async def test_exponential_backoff_on_failure() -> None:
-    """When the fetcher raises, sleep time should increase exponentially."""
-    event_bus = EventBus()
-    state_manager = StateManager()
+async def test_stop_cancels_in_flight_polls() -> None:
+    """Polls still waiting on the network are cancelled, not leaked."""
+    started = 0
+    all_started = asyncio.Event()
+
+    async def hang(*args, **kwargs) -> FetchResult:
+        nonlocal started
+        started += 1
+        if started == 3:
+            all_started.set()
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
     fetcher = MagicMock()
-    # Fetcher always raises an exception.
-    fetcher.fetch = AsyncMock(side_effect=RuntimeError("network error"))
+    fetcher.fetch = AsyncMock(side_effect=hang)
+    scheduler = PollScheduler(
+        providers=[_make_provider(f"P{i}") for i in range(3)],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
+    )
 
-    provider = _make_provider(interval=10)
+    with patch("core.scheduler._STAGGER_DELAY", 0):
+        await scheduler.start()
+    await asyncio.wait_for(all_started.wait(), timeout=1.0)
+    polls = [t for t in asyncio.all_tasks() if t.get_name().startswith("poll-P")]
+    assert len(polls) == 3
+
+    await scheduler.stop()
+    assert all(t.cancelled() for t in polls)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_polls_and_requeues_provider() -> None:
+    """A due provider is polled once, then queued again for its next run."""
+    fetcher = MagicMock()
+    fetcher.fetch = AsyncMock(return_value=_make_fetch_result(status_code=304, content=None))
     scheduler = PollScheduler(
-        providers=[provider],
-        event_bus=event_bus,
+        providers=[_make_provider()],
+        event_bus=EventBus(),
         fetcher=fetcher,
-        state_manager=state_manager,
+        state_manager=StateManager(),
     )
 
-    sleep_times: list[float] = []
+    await scheduler.start()
+    try:
+        while not (fetcher.fetch.await_count and scheduler._heap):
+            await asyncio.sleep(0)
+    finally:
+        await scheduler.stop()
 
-    original_sleep = asyncio.sleep
+    assert fetcher.fetch.await_count == 1
 
-    async def mock_sleep(delay: float) -> None:
-        sleep_times.append(delay)
-        # Only let a few iterations run, then cancel.
-        if len(sleep_times) >= 3:
-            raise asyncio.CancelledError()
-        # For stagger delay, use original.
-        if delay == _STAGGER_DELAY:
-            return
 
-    with patch("core.scheduler.asyncio.sleep", side_effect=mock_sleep):
-        with patch("core.scheduler.random.uniform", return_value=0):
-            await scheduler.start()
-            # Wait for tasks to run.
-            try:
-                await asyncio.gather(*scheduler._tasks, return_exceptions=True)
-            except asyncio.CancelledError:
-                pass
+@pytest.mark.asyncio
+async def test_exponential_backoff_on_failure(virtual_clock) -> None:
+    """When the fetcher raises, the gap before the next poll doubles."""
+    fetch_times: list[float] = []
+
+    async def failing_fetch(*args, **kwargs) -> FetchResult:
+        fetch_times.append(virtual_clock.time())
+        raise RuntimeError("network error")
+
+    fetcher = MagicMock()
+    fetcher.fetch = failing_fetch
+    scheduler = PollScheduler(
+        providers=[_make_provider(interval=10)],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
+        rng=NoJitter(),
+    )
+
+    await scheduler.start()
+    try:
+        await virtual_clock.advance(150)
+    finally:
+        await scheduler.stop()
 
-    # Filter out stagger delays.
-    backoff_times = [t for t in sleep_times if t != _STAGGER_DELAY]
     # With failure_count 1, 2, 3: backoff = 10*2^1=20, 10*2^2=40, 10*2^3=80
-    assert len(backoff_times) >= 2
-    assert backoff_times[0] < backoff_times[1], (
-        f"Expected increasing backoff: {backoff_times}"
+    gaps = [later - earlier for earlier, later in zip(fetch_times, fetch_times[1:])]
+    assert gaps == [20, 40, 80]
+
+
+@pytest.mark.asyncio
+async def test_backoff_respects_max_ceiling() -> None:
+    """Backoff stops doubling at max_backoff_seconds, give or take jitter."""
+    fetcher = SequencedFetcher([RuntimeError("network error")])
+    scheduler = PollScheduler(
+        providers=[_make_provider(interval=10, max_backoff_seconds=60)],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
     )
+    (slot,) = scheduler._slots
+
+    delays = [await scheduler._poll_provider(slot) for _ in range(10)]
+
+    assert max(delays) <= 60 * 1.1
+    assert min(delays[3:]) >= 60 * 0.9
+
+
+async def _collect(event_bus: EventBus, events: list) -> None:
+    async for event in event_bus.subscribe():
+        events.append(event)
 
 
 @pytest.mark.asyncio
-async def test_successful_poll_resets_failure_count() -> None:
-    """After a successful poll, the next sleep should use the base interval (no backoff)."""
+async def test_poll_cut_short_by_cancellation_is_requeued(virtual_clock) -> None:
+    """A CancelledError leaking out of a shared fetch must not drop the slot."""
+    fetcher = SequencedFetcher(
+        [asyncio.CancelledError(), _make_fetch_result(status_code=304, content=None)]
+    )
+    scheduler = PollScheduler(
+        providers=[_make_provider(interval=10)],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
+        rng=NoJitter(),
+    )
+
+    await scheduler.start()
+    try:
+        await virtual_clock.advance(11)
+        assert fetcher.calls == 2
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_dispatcher_crash() -> None:
+    """run() fails loudly instead of leaving every provider unpolled."""
+
+    def on_started(name: str, loop_time: float) -> None:
+        raise RuntimeError("hook failed")
+
+    scheduler = PollScheduler(
+        providers=[_make_provider()],
+        event_bus=EventBus(),
+        fetcher=SequencedFetcher([_make_fetch_result(status_code=304, content=None)]),
+        state_manager=StateManager(),
+        on_provider_started=on_started,
+    )
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        async with asyncio.timeout(2.0):
+            await scheduler.run()
+    assert excinfo.group_contains(RuntimeError, match="hook failed")
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_probes_and_closes_on_recovery(virtual_clock) -> None:
+    """After 5 straight failures the provider is probed at the ceiling."""
     event_bus = EventBus()
+    events: list = []
+    fetcher = SequencedFetcher(
+        [RuntimeError("network error")] * 7
+        + [_make_fetch_result(status_code=304, content=None)]
+    )
+    scheduler = PollScheduler(
+        providers=[_make_provider(interval=10, max_backoff_seconds=60)],
+        event_bus=event_bus,
+        fetcher=fetcher,
+        state_manager=StateManager(),
+        rng=NoJitter(),
+    )
+    (slot,) = scheduler._slots
+
+    collector = asyncio.create_task(_collect(event_bus, events))
+    await event_bus.wait_for_subscribers()
+    await scheduler.start()
+    try:
+        # Failures at t=0, 20, 60, 120 and 180; the fifth opens the breaker.
+        await virtual_clock.advance(200)
+        assert fetcher.calls == 5
+        assert slot.breaker_open
+        assert [e.event_type for e in events] == ["circuit_open"]
+
+        # Probes at t=240 and 300 fail quietly; the one at 360 succeeds.
+        await virtual_clock.advance(165)
+        assert fetcher.calls == 8
+        assert not slot.breaker_open
+        assert len(events) == 1
+    finally:
+        await scheduler.stop()
+        collector.cancel()
+
+
+@pytest.mark.asyncio
+async def test_error_status_counts_towards_circuit_breaker(
+    feed_server: TestServer,
+) -> None:
+    """A feed that keeps answering 503 backs off and trips the breaker."""
+    event_bus = EventBus()
+    events: list = []
     state_manager = StateManager()
-    fetcher = MagicMock()
+    provider = {
+        "name": "TestProvider",
+        "feed_url": str(feed_server.make_url("/unavailable.atom")),
+        "poll_interval_seconds": 0.01,
+        "max_backoff_seconds": 0.01,
+    }
+    async with FeedFetcher(
+        semaphore=asyncio.Semaphore(1), session=aiohttp.ClientSession()
+    ) as fetcher:
+        scheduler = PollScheduler(
+            providers=[provider],
+            event_bus=event_bus,
+            fetcher=fetcher,
+            state_manager=state_manager,
+        )
+        (slot,) = scheduler._slots
+
+        collector = asyncio.create_task(_collect(event_bus, events))
+        await event_bus.wait_for_subscribers()
+        await scheduler.start()
+        try:
+            async with asyncio.timeout(5.0):
+                while not slot.breaker_open:
+                    await asyncio.sleep(0.01)
+        finally:
+            await scheduler.stop()
+            collector.cancel()
+
+    assert slot.consecutive_failures >= 5
+    assert [e.event_type for e in events] == ["circuit_open"]
+    # The error page never reached the parser or the state.
+    state = state_manager.get_state("TestProvider")
+    assert state.etag is None
+    assert state.content_hash is None
+    assert not state.seen_entries
+
+
+@pytest.mark.asyncio
+async def test_reset_breaker_probes_immediately(virtual_clock) -> None:
+    """reset_breaker() polls right away and drops the pending probe."""
+    fetcher = SequencedFetcher([RuntimeError("network error")])
+    scheduler = PollScheduler(
+        providers=[_make_provider(interval=10, max_backoff_seconds=60)],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
+        rng=NoJitter(),
+    )
 
-    call_count = 0
+    await scheduler.start()
+    try:
+        await virtual_clock.advance(200)  # open; next probe due at t=240
+        assert fetcher.calls == 5
+        assert not scheduler.reset_breaker("Unknown")
+
+        assert scheduler.reset_breaker("TestProvider")
+        assert not scheduler.reset_breaker("TestProvider")
+        await virtual_clock.advance(0)
+        assert fetcher.calls == 6  # polled at once, backoff restarts at 20s
 
-    async def fetch_side_effect(*args, **kwargs) -> FetchResult:
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            raise RuntimeError("temporary failure")
-        # Return 304 for subsequent calls (no content to parse).
-        return _make_fetch_result(status_code=304, content=None)
+        # Poll at t=220, then t=260; the superseded t=240 probe is skipped.
+        await virtual_clock.advance(50)
+        assert fetcher.calls == 7
+    finally:
+        await scheduler.stop()
 
-    fetcher.fetch = AsyncMock(side_effect=fetch_side_effect)
+
+@pytest.mark.asyncio
+async def test_successful_poll_resets_failure_count() -> None:
+    """With no stability window, one success clears the backoff."""
+    event_bus = EventBus()
+    state_manager = StateManager()
+    fetcher = SequencedFetcher(
+        [
+            RuntimeError("temporary failure"),
+            # No content to parse on the retry.
+            _make_fetch_result(status_code=304, content=None),
+        ]
+    )
 
     provider = _make_provider(interval=10)
     scheduler = PollScheduler(
@@ -152,69 +385,200 @@ async def test_successful_poll_resets_failure_count() -> None:
         event_bus=event_bus,
         fetcher=fetcher,
         state_manager=state_manager,
+        failure_reset_seconds=0,
+        rng=NoJitter(),
     )
+    (slot,) = scheduler._slots
 
-    sleep_times: list[float] = []
+    delays = [await scheduler._poll_provider(slot) for _ in range(2)]
 
-    async def mock_sleep(delay: float) -> None:
-        sleep_times.append(delay)
-        if len(sleep_times) >= 3:
-            raise asyncio.CancelledError()
+    # First call fails -> backoff = 10*2^1 = 20
+    # Second call succeeds -> delay = 10 (base interval, jitter=0)
+    assert delays == [20, 10]
+    assert slot.failure_count == 0
 
-    with patch("core.scheduler.asyncio.sleep", side_effect=mock_sleep):
-        with patch("core.scheduler.random.uniform", return_value=0):
-            await scheduler.start()
-            try:
-                await asyncio.gather(*scheduler._tasks, return_exceptions=True)
-            except asyncio.CancelledError:
-                pass
 
-    backoff_times = [t for t in sleep_times if t != _STAGGER_DELAY]
-    # First call fails -> backoff = 10*2^1 = 20
-    # Second call succeeds -> sleep = 10 (base interval, jitter=0)
-    assert len(backoff_times) >= 2
-    assert backoff_times[0] == 20  # failure backoff
-    assert backoff_times[1] == 10  # reset to base interval
+@pytest.mark.asyncio
+async def test_flap_does_not_immediately_reset() -> None:
+    """A lone success between failures keeps the backoff escalating."""
+    fetcher = SequencedFetcher(
+        [
+            RuntimeError("down"),
+            _make_fetch_result(status_code=304, content=None),
+            RuntimeError("down again"),
+        ]
+    )
+    scheduler = PollScheduler(
+        providers=[_make_provider(interval=10)],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
+        rng=NoJitter(),
+    )
+    (slot,) = scheduler._slots
+
+    delays = [await scheduler._poll_provider(slot) for _ in range(3)]
+
+    # fail -> 20, success -> base 10, fail -> 40 (not back to 20)
+    assert delays == [20, 10, 40]
+    assert slot.failure_count == 2
 
 
 @pytest.mark.asyncio
-async def test_staggered_startup_timing() -> None:
-    """Tasks should be started with a stagger delay between them."""
-    event_bus = EventBus()
+async def test_staggered_startup_timing(virtual_clock) -> None:
+    """First polls should be spaced by the stagger delay."""
+    fetcher = SequencedFetcher([_make_fetch_result(status_code=304, content=None)])
+    records: list[tuple[str, float]] = []
+
+    scheduler = PollScheduler(
+        providers=[_make_provider("A"), _make_provider("B"), _make_provider("C")],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=StateManager(),
+        on_provider_started=lambda name, t: records.append((name, t)),
+    )
+
+    await scheduler.start()
+    try:
+        await virtual_clock.advance(1, step=0.05)
+    finally:
+        await scheduler.stop()
+
+    assert [name for name, _ in records] == ["A", "B", "C"]
+    gaps = [later[1] - earlier[1] for earlier, later in zip(records, records[1:])]
+    assert all(gap >= _STAGGER_DELAY - 1e-3 for gap in gaps)
+    assert fetcher.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_identical_body_skips_parse() -> None:
+    """A 200 with the same body as the previous poll should not be re-parsed."""
     state_manager = StateManager()
     fetcher = MagicMock()
-    fetcher.fetch = AsyncMock(return_value=_make_fetch_result(status_code=304, content=None))
+    fetcher.fetch = AsyncMock(return_value=_make_fetch_result(content=b"<feed></feed>"))
 
-    providers = [_make_provider("A"), _make_provider("B"), _make_provider("C")]
+    scheduler = PollScheduler(
+        providers=[_make_provider()],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=state_manager,
+    )
 
-    sleep_calls: list[float] = []
+    with patch.object(scheduler._parser, "parse", return_value=[]) as parse:
+        await scheduler._poll_once("TestProvider", "TestProvider", "https://x")
+        await scheduler._poll_once("TestProvider", "TestProvider", "https://x")
 
-    original_sleep = asyncio.sleep
+    assert parse.call_count == 1
+    assert state_manager.get_state("TestProvider").content_hash is not None
 
-    async def tracking_sleep(delay: float) -> None:
-        sleep_calls.append(delay)
-        # Let stagger delays proceed immediately.
-        if delay == _STAGGER_DELAY:
-            return
-        # Cancel the polling loop after first poll.
-        raise asyncio.CancelledError()
+
+@pytest.mark.asyncio
+async def test_poll_once_classifies_new_and_updated(sample_atom_feed: str) -> None:
+    """Unseen entries are 'new'; entries with a changed timestamp are 'updated'."""
+    state_manager = StateManager()
+    state_manager.mark_seen("GitHub", "incident-001", "2025-06-14T00:00:00Z")
+    state_manager.mark_seen("GitHub", "incident-002", "2025-06-14T08:00:00Z")
+    event_bus = MagicMock()
+    event_bus.publish = AsyncMock()
+    fetcher = MagicMock()
+    fetcher.fetch = AsyncMock(return_value=_make_fetch_result(content=sample_atom_feed.encode()))
 
     scheduler = PollScheduler(
-        providers=providers,
+        providers=[_make_provider("GitHub")],
         event_bus=event_bus,
         fetcher=fetcher,
         state_manager=state_manager,
     )
+    await scheduler._poll_once("GitHub", "GitHub", "https://x")
+
+    published = [call.args[0] for call in event_bus.publish.call_args_list]
+    assert [(e.incident_id, e.event_type) for e in published] == [
+        ("incident-001", "updated"),
+        ("incident-003", "new"),
+    ]
+    assert state_manager.get_state("GitHub").seen_entries["incident-001"] == (
+        parse_timestamp_ns("2025-06-15T10:30:00Z")
+    )
 
-    with patch("core.scheduler.asyncio.sleep", side_effect=tracking_sleep):
-        await scheduler.start()
-        try:
-            await asyncio.gather(*scheduler._tasks, return_exceptions=True)
-        except asyncio.CancelledError:
-            pass
 
-    # There should be stagger delays between the 2nd and 3rd provider launches.
-    stagger_calls = [t for t in sleep_calls if t == _STAGGER_DELAY]
-    assert len(stagger_calls) >= 2, (
-        f"Expected at least 2 stagger delays for 3 providers, got {stagger_calls}"
+# Polls one 200 response into a journaled StateManager, with the parser
+# killing the process when argv[2] == "kill".
+_CRASH_SCRIPT = textwrap.dedent(
+    """
+    import asyncio, os, sys
+    from pathlib import Path
+    from core.fetcher import FetchResult
+    from core.scheduler import PollScheduler
+    from core.state import StateManager
+    from events.bus import EventBus
+    from tests._helpers import SequencedFetcher
+
+    state_manager = StateManager(snapshot_path=Path(sys.argv[1]))
+    fetcher = SequencedFetcher(
+        [FetchResult(200, sys.stdin.buffer.read(), '"v2"', "Mon, 16 Jun 2025")]
+    )
+    scheduler = PollScheduler(
+        providers=[{"name": "GitHub", "feed_url": "https://x"}],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=state_manager,
+    )
+    if sys.argv[2] == "kill":
+        scheduler._parser.parse = lambda *args: os._exit(9)
+    asyncio.run(scheduler._poll_once("GitHub", "GitHub", "https://x"))
+    state_manager.close()
+    """
+)
+
+
+@pytest.mark.parametrize("mode", ["kill", "complete"])
+def test_validators_are_not_persisted_ahead_of_entries(
+    tmp_path, sample_atom_feed: str, mode: str
+) -> None:
+    """A crash mid-poll must not leave a journaled ETag for unseen entries."""
+    path = tmp_path / "state.mpk"
+    proc = subprocess.run(
+        [sys.executable, "-c", _CRASH_SCRIPT, str(path), mode],
+        input=sample_atom_feed.encode(),
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+    )
+    assert proc.returncode == (9 if mode == "kill" else 0), proc.stderr
+
+    restored = StateManager(snapshot_path=path)
+    restored.close()
+    state = restored.get_state("GitHub")
+    if mode == "kill":
+        # Next poll sends no validators, so the feed is fetched and diffed.
+        assert (state.etag, state.last_modified) == (None, None)
+        assert not state.seen_entries
+    else:
+        assert state.etag == '"v2"'
+        assert len(state.seen_entries) == 3
+
+
+@pytest.mark.asyncio
+async def test_partial_feed_drops_possibly_truncated_last_entry(
+    sample_atom_feed: str,
+) -> None:
+    """On 206 the last parsed entry is ignored since it may be cut off."""
+    state_manager = StateManager()
+    state_manager.update_range_support("GitHub", "bytes", _RANGE_MIN_FEED_BYTES)
+    fetcher = MagicMock()
+    fetcher.fetch = AsyncMock(
+        return_value=_make_fetch_result(
+            status_code=206, content=sample_atom_feed.encode()
+        )
+    )
+    scheduler = PollScheduler(
+        providers=[_make_provider("GitHub")],
+        event_bus=EventBus(),
+        fetcher=fetcher,
+        state_manager=state_manager,
     )
+
+    await scheduler._poll_once("GitHub", "GitHub", "https://x")
+
+    assert fetcher.fetch.call_args.kwargs["byte_range"] == _FEED_HEAD_BYTES
+    seen = state_manager.get_state("GitHub").seen_entries
+    assert list(seen) == ["incident-001", "incident-002"]
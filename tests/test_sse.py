@@ -0,0 +1,293 @@
+"""Tests for consumers.sse.SSEConsumer."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+import consumers.sse
+from consumers.sse import SSEConsumer
+from events.bus import EventBus
+from events.models import StatusEvent
+
+
+@pytest.fixture
+def make_consumer(
+    event_bus: EventBus, unused_tcp_port: int
+) -> Callable[..., SSEConsumer]:
+    def make(reset_breaker: Optional[Callable[[str], bool]] = None) -> SSEConsumer:
+        return SSEConsumer(
+            event_bus,
+            host="127.0.0.1",
+            port=unused_tcp_port,
+            reset_breaker=reset_breaker,
+        )
+
+    return make
+
+
+@pytest.fixture
+async def sse(make_consumer) -> AsyncIterator[SSEConsumer]:
+    """A started consumer without a breaker-reset endpoint."""
+    consumer = make_consumer()
+    await consumer.start()
+    yield consumer
+    await consumer.stop()
+
+
+@pytest.fixture
+async def client() -> AsyncIterator[aiohttp.ClientSession]:
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+_INDEX_HTML = Path(consumers.sse.__file__).parent.parent / "static" / "index.html"
+
+
+def _url(consumer: SSEConsumer, path: str) -> str:
+    return f"http://{consumer._host}:{consumer._port}{path}"
+
+
+def _event(incident_id: str) -> StatusEvent:
+    return StatusEvent(
+        provider="GitHub",
+        product="GitHub - Actions",
+        status="Investigating",
+        message="Elevated error rates.",
+        timestamp=datetime(2025, 6, 15, 10, 30, tzinfo=timezone.utc),
+        incident_id=incident_id,
+        event_type="new",
+    )
+
+
+async def _wait_for_clients(consumer: SSEConsumer, n: int) -> None:
+    async with asyncio.timeout(2.0):
+        while len(consumer._clients) != n:
+            await asyncio.sleep(0.005)
+
+
+async def _read_frame(resp: aiohttp.ClientResponse) -> dict:
+    async with asyncio.timeout(2.0):
+        frame = await resp.content.readuntil(b"\n\n")
+    assert frame.startswith(b"data: ")
+    return json.loads(frame[len(b"data: ") :])
+
+
+async def test_reset_endpoint_closes_open_breaker(make_consumer, client) -> None:
+    reset_calls: list[str] = []
+
+    def reset_breaker(name: str) -> bool:
+        reset_calls.append(name)
+        return name == "GitHub"
+
+    consumer = make_consumer(reset_breaker)
+    await consumer.start()
+    try:
+        async with client.post(_url(consumer, "/providers/GitHub/reset")) as resp:
+            assert resp.status == 204
+        async with client.post(_url(consumer, "/providers/AWS/reset")) as resp:
+            assert resp.status == 404
+    finally:
+        await consumer.stop()
+
+    assert reset_calls == ["GitHub", "AWS"]
+
+
+async def test_reset_endpoint_rejects_remote_clients(make_consumer) -> None:
+    reset_calls: list[str] = []
+    consumer = make_consumer(lambda name: reset_calls.append(name) or True)
+    transport = MagicMock()
+    transport.get_extra_info.return_value = ("203.0.113.7", 50000)
+    request = make_mocked_request(
+        "POST",
+        "/providers/GitHub/reset",
+        match_info={"name": "GitHub"},
+        transport=transport,
+    )
+
+    with pytest.raises(web.HTTPForbidden):
+        await consumer._handle_reset_breaker(request)
+    assert reset_calls == []
+
+
+async def test_reset_endpoint_absent_without_callback(make_consumer, client) -> None:
+    consumer = make_consumer()
+    await consumer.start()
+    try:
+        async with client.post(_url(consumer, "/providers/GitHub/reset")) as resp:
+            assert resp.status in (404, 405)
+    finally:
+        await consumer.stop()
+
+
+async def test_event_is_encoded_once_for_all_clients(
+    sse: SSEConsumer, event_bus: EventBus, monkeypatch
+) -> None:
+    encoded: list[str] = []
+    encode = sse._encode_frame
+
+    def counting_encode(event: StatusEvent) -> bytes:
+        encoded.append(event.incident_id)
+        return encode(event)
+
+    monkeypatch.setattr(sse, "_encode_frame", counting_encode)
+
+    async with aiohttp.ClientSession() as a, aiohttp.ClientSession() as b:
+        async with a.get(_url(sse, "/events")) as resp_a, b.get(
+            _url(sse, "/events")
+        ) as resp_b:
+            await _wait_for_clients(sse, 2)
+            await event_bus.publish(_event("inc-1"))
+
+            frame_a = await _read_frame(resp_a)
+            frame_b = await _read_frame(resp_b)
+
+    assert frame_a == frame_b
+    assert frame_a["incident_id"] == "inc-1"
+    assert encoded == ["inc-1"]
+
+
+async def test_slow_client_drops_oldest_without_blocking_others(
+    sse: SSEConsumer, event_bus: EventBus, client: aiohttp.ClientSession
+) -> None:
+    # A client that never reads: its queue is full after two payloads.
+    stalled: asyncio.Queue[bytes] = asyncio.Queue(maxsize=2)
+    sse._clients.add(stalled)
+
+    async with client.get(_url(sse, "/events")) as resp:
+        await _wait_for_clients(sse, 2)
+        for i in range(4):
+            await event_bus.publish(_event(f"inc-{i}"))
+            # Each publish is its own burst; the live client still gets it.
+            assert (await _read_frame(resp))["incident_id"] == f"inc-{i}"
+
+    kept = [stalled.get_nowait() for _ in range(stalled.qsize())]
+    assert [b"inc-2" in p and b"inc-3" not in p for p in kept] == [True, False]
+    assert b"inc-3" in kept[1]
+
+
+async def test_disconnected_client_is_removed(
+    sse: SSEConsumer, event_bus: EventBus, client: aiohttp.ClientSession
+) -> None:
+    async with client.get(_url(sse, "/events")):
+        await _wait_for_clients(sse, 1)
+
+    # The server notices the disconnect on its next write to the client.
+    async with asyncio.timeout(2.0):
+        while sse._clients:
+            await event_bus.publish(_event("inc-1"))
+            await asyncio.sleep(0.06)
+
+
+async def test_index_is_gzipped_when_accepted(sse: SSEConsumer) -> None:
+    async with aiohttp.ClientSession(auto_decompress=False) as session:
+        async with session.get(
+            _url(sse, "/"), headers={"Accept-Encoding": "gzip, deflate"}
+        ) as resp:
+            assert resp.status == 200
+            assert resp.headers["Content-Encoding"] == "gzip"
+            assert resp.headers["Vary"] == "Accept-Encoding"
+            body = await resp.read()
+
+    assert gzip.decompress(body) == _INDEX_HTML.read_bytes()
+
+
+async def test_index_falls_back_to_identity(sse: SSEConsumer) -> None:
+    async with aiohttp.ClientSession(auto_decompress=False) as session:
+        async with session.get(
+            _url(sse, "/"), headers={"Accept-Encoding": "identity"}
+        ) as resp:
+            assert resp.status == 200
+            assert "Content-Encoding" not in resp.headers
+            assert resp.content_type == "text/html"
+            body = await resp.read()
+
+    assert body == _INDEX_HTML.read_bytes()
+
+
+async def test_index_is_served_from_cache(
+    sse: SSEConsumer, client: aiohttp.ClientSession, monkeypatch, tmp_path
+) -> None:
+    # The file was read in start(); requests must not touch the disk again.
+    monkeypatch.setattr(consumers.sse, "_STATIC_DIR", tmp_path / "missing")
+
+    async with client.get(_url(sse, "/")) as resp:
+        assert resp.status == 200
+        assert await resp.read() == _INDEX_HTML.read_bytes()
+
+
+async def test_events_stream_headers(
+    sse: SSEConsumer, client: aiohttp.ClientSession
+) -> None:
+    async with client.get(_url(sse, "/events")) as resp:
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == "text/event-stream"
+        assert resp.headers["Cache-Control"] == "no-cache"
+        assert resp.headers["X-Accel-Buffering"] == "no"
+
+
+async def test_burst_is_sent_in_one_write(
+    sse: SSEConsumer,
+    event_bus: EventBus,
+    client: aiohttp.ClientSession,
+    monkeypatch,
+) -> None:
+    writes: list[bytes] = []
+    write = web.StreamResponse.write
+
+    async def recording_write(self: web.StreamResponse, data: bytes) -> None:
+        writes.append(bytes(data))
+        await write(self, data)
+
+    monkeypatch.setattr(web.StreamResponse, "write", recording_write)
+
+    async with client.get(_url(sse, "/events")) as resp:
+        await _wait_for_clients(sse, 1)
+        for i in range(3):
+            await event_bus.publish(_event(f"inc-{i}"))
+            # Spread out, but well inside the consumer's batch window.
+            await asyncio.sleep(0.005)
+
+        frames = [await _read_frame(resp) for _ in range(3)]
+
+    assert [f["incident_id"] for f in frames] == ["inc-0", "inc-1", "inc-2"]
+    assert len(writes) == 1
+    assert writes[0].count(b"data: ") == 3
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        datetime(2025, 6, 15, 10, 30, 1, 123),
+        datetime(2025, 6, 15, 10, 30, tzinfo=timezone.utc),
+    ],
+    ids=["naive", "aware"],
+)
+def test_json_fallback_matches_orjson(timestamp: datetime, monkeypatch) -> None:
+    pytest.importorskip("orjson")
+    event = StatusEvent(
+        provider="Café Status",
+        product="API",
+        status="Resolved",
+        message='Fixed "quoted" issue.',
+        timestamp=timestamp,
+        incident_id="inc-1",
+        event_type="updated",
+    )
+
+    fast = SSEConsumer._encode_frame(event)
+    monkeypatch.setattr(consumers.sse, "orjson", None)
+    fallback = SSEConsumer._encode_frame(event)
+
+    assert fallback == fast
+    assert json.loads(fast[len(b"data: ") :])["timestamp"].endswith("+00:00")
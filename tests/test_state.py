@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
-from core.state import ProviderState, StateManager
+import asyncio
+from datetime import datetime, timezone
+
+import msgpack
+
+from core.state import (
+    ProviderState,
+    StateManager,
+    parse_timestamp,
+    parse_timestamp_ns,
+)
 
 
 class TestGetState:
@@ -28,6 +38,9 @@ class TestGetState:
         s2 = sm.get_state("AWS")
         assert s1 is not s2
 
+    def test_provider_state_has_no_dict(self) -> None:
+        assert not hasattr(ProviderState(), "__dict__")
+
 
 class TestUpdateEtag:
     """Verify that update_etag persists caching header values."""
@@ -88,11 +101,190 @@ class TestMarkSeen:
         sm.mark_seen("GitHub", "inc-001", "2025-06-15T10:00:00Z")
         state = sm.get_state("GitHub")
         assert "inc-001" in state.seen_entries
-        assert state.seen_entries["inc-001"] == "2025-06-15T10:00:00Z"
+        assert state.seen_entries["inc-001"] == 1_749_981_600_000_000_000
 
     def test_mark_seen_updates_existing_entry(self) -> None:
         sm = StateManager()
         sm.mark_seen("GitHub", "inc-001", "2025-06-15T10:00:00Z")
         sm.mark_seen("GitHub", "inc-001", "2025-06-15T12:00:00Z")
         state = sm.get_state("GitHub")
-        assert state.seen_entries["inc-001"] == "2025-06-15T12:00:00Z"
+        assert state.seen_entries["inc-001"] == parse_timestamp_ns(
+            "2025-06-15T12:00:00Z"
+        )
+
+    def test_mark_seen_many_records_all_entries(self) -> None:
+        sm = StateManager()
+        sm.mark_seen("GitHub", "inc-001", "2025-06-15T10:00:00Z")
+        sm.mark_seen_many(
+            "GitHub",
+            {"inc-001": "2025-06-15T12:00:00Z", "inc-002": "2025-06-15T11:00:00Z"},
+        )
+        state = sm.get_state("GitHub")
+        assert state.seen_entries == {
+            "inc-001": parse_timestamp_ns("2025-06-15T12:00:00Z"),
+            "inc-002": parse_timestamp_ns("2025-06-15T11:00:00Z"),
+        }
+
+    def test_oldest_entry_evicted_past_cap(self) -> None:
+        sm = StateManager(max_seen_entries=2)
+        sm.mark_seen("GitHub", "inc-001", "t1")
+        sm.mark_seen("GitHub", "inc-002", "t2")
+        sm.mark_seen("GitHub", "inc-001", "t3")  # refreshes inc-001
+        sm.mark_seen("GitHub", "inc-003", "t4")
+        state = sm.get_state("GitHub")
+        assert list(state.seen_entries) == ["inc-001", "inc-003"]
+
+
+class TestConcurrentWrites:
+    """Concurrent polls share one StateManager without locking."""
+
+    async def test_concurrent_mark_seen_no_lost_writes(self) -> None:
+        sm = StateManager()
+
+        async def poll(index: int) -> None:
+            name = f"Provider{index}"
+            # Yield between the two writes so the tasks interleave.
+            sm.update_etag(name, etag=f'"{index}"', last_modified=None)
+            await asyncio.sleep(0)
+            sm.mark_seen_many(
+                name, {f"inc-{index}-{i}": "2025-06-15T10:00:00Z" for i in range(5)}
+            )
+
+        await asyncio.gather(*(poll(i) for i in range(100)))
+
+        for index in range(100):
+            state = sm.get_state(f"Provider{index}")
+            assert state.etag == f'"{index}"'
+            assert list(state.seen_entries) == [f"inc-{index}-{i}" for i in range(5)]
+
+
+class TestParseTimestamp:
+    """Entry timestamps go through one cached ISO 8601 parser."""
+
+    def test_accepts_z_suffix(self) -> None:
+        ts = parse_timestamp("2025-06-15T10:30:00Z")
+        assert ts == datetime(2025, 6, 15, 10, 30, tzinfo=timezone.utc)
+
+    def test_naive_timestamp_is_utc(self) -> None:
+        ts = parse_timestamp("2025-06-15T10:30:00")
+        assert ts == datetime(2025, 6, 15, 10, 30, tzinfo=timezone.utc)
+
+    def test_unparseable_value_returns_none(self) -> None:
+        assert parse_timestamp("not a date") is None
+
+    def test_repeated_timestamp_hits_cache(self) -> None:
+        parse_timestamp.cache_clear()
+        parse_timestamp("2025-06-15T10:00:00Z")
+        parse_timestamp("2025-06-15T10:00:00Z")
+        assert parse_timestamp.cache_info().hits == 1
+
+
+class TestParseTimestampNs:
+    """Seen-entry timestamps are stored as epoch nanoseconds."""
+
+    def test_agrees_with_parse_timestamp(self) -> None:
+        value = "2025-06-15T12:00:00+02:00"
+        assert parse_timestamp_ns(value) == int(parse_timestamp(value).timestamp()) * 10**9
+
+    def test_equivalent_offsets_compare_equal(self) -> None:
+        assert parse_timestamp_ns("2025-06-15T10:00:00Z") == parse_timestamp_ns(
+            "2025-06-15T12:00:00+02:00"
+        )
+
+    def test_keeps_sub_second_precision(self) -> None:
+        assert parse_timestamp_ns("1970-01-01T00:00:01.000001Z") == 1_000_001_000
+
+    def test_non_iso_values_still_distinguish_changes(self) -> None:
+        assert parse_timestamp_ns("t1") == parse_timestamp_ns("t1")
+        assert parse_timestamp_ns("t1") != parse_timestamp_ns("t2")
+
+
+class TestSnapshot:
+    """Verify state survives a save/load round trip."""
+
+    async def test_state_survives_restart(self, tmp_path) -> None:
+        path = tmp_path / "state.mpk"
+        sm = StateManager(snapshot_path=path)
+        sm.update_etag("GitHub", etag='"abc"', last_modified="some-date")
+        sm.mark_seen("GitHub", "inc-001", "2025-06-15T10:00:00Z")
+        sm.mark_seen("GitHub", "inc-002", "2025-06-15T11:00:00Z")
+        await sm.save()
+        sm.close()
+
+        restored = StateManager(snapshot_path=path)
+        state = restored.get_state("GitHub")
+        assert state.etag == '"abc"'
+        assert list(state.seen_entries) == ["inc-001", "inc-002"]
+        assert restored.is_new_or_updated(
+            "GitHub", "inc-001", "2025-06-15T10:00:00Z"
+        ) == (False, "")
+
+    def test_unsaved_changes_are_replayed_from_journal(self, tmp_path) -> None:
+        path = tmp_path / "state.mpk"
+        sm = StateManager(snapshot_path=path)
+        sm.update_etag("GitHub", etag='"abc"', last_modified=None)
+        entries = {f"inc-{i:03d}": "2025-06-15T10:00:00Z" for i in range(50)}
+        sm.mark_seen_many("GitHub", entries)
+        # No save(): simulate a crash between snapshots.
+        sm.close()
+
+        restored = StateManager(snapshot_path=path)
+        restored.close()
+        assert restored.get_state("GitHub").etag == '"abc"'
+        for entry_id, updated in entries.items():
+            assert restored.is_new_or_updated("GitHub", entry_id, updated) == (
+                False,
+                "",
+            )
+
+    async def test_save_truncates_journal(self, tmp_path) -> None:
+        path = tmp_path / "state.mpk"
+        journal = tmp_path / "state.mpk.journal"
+        sm = StateManager(snapshot_path=path)
+        sm.mark_seen("GitHub", "inc-001", "2025-06-15T10:00:00Z")
+        assert journal.stat().st_size > 0
+
+        await sm.save()
+        assert journal.stat().st_size == 0
+
+        sm.mark_seen("GitHub", "inc-002", "2025-06-15T11:00:00Z")
+        sm.close()
+        restored = StateManager(snapshot_path=path)
+        restored.close()
+        assert list(restored.get_state("GitHub").seen_entries) == [
+            "inc-001",
+            "inc-002",
+        ]
+
+    def test_torn_journal_record_is_ignored(self, tmp_path) -> None:
+        path = tmp_path / "state.mpk"
+        sm = StateManager(snapshot_path=path)
+        sm.mark_seen("GitHub", "inc-001", "2025-06-15T10:00:00Z")
+        sm.mark_seen("GitHub", "inc-002", "2025-06-15T11:00:00Z")
+        sm.close()
+        journal = tmp_path / "state.mpk.journal"
+        journal.write_bytes(journal.read_bytes()[:-3])
+
+        restored = StateManager(snapshot_path=path)
+        restored.close()
+        assert list(restored.get_state("GitHub").seen_entries) == ["inc-001"]
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path) -> None:
+        path = tmp_path / "state.mpk"
+        path.write_bytes(b"\xc1not msgpack")
+        sm = StateManager(snapshot_path=path)
+        assert sm.get_state("GitHub").seen_entries == {}
+
+    def test_string_timestamps_from_older_snapshot_are_converted(
+        self, tmp_path
+    ) -> None:
+        path = tmp_path / "state.mpk"
+        path.write_bytes(
+            msgpack.packb(
+                {"GitHub": {"seen_entries": [["inc-001", "2025-06-15T10:00:00Z"]]}}
+            )
+        )
+        sm = StateManager(snapshot_path=path)
+        assert sm.is_new_or_updated(
+            "GitHub", "inc-001", "2025-06-15T10:00:00Z"
+        ) == (False, "")